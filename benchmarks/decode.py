@@ -0,0 +1,54 @@
+"""Decoding throughput compared with json.loads on equivalent data.
+
+Run with: uv run python benchmarks/decode.py [rows ...]
+"""
+
+import json
+import sys
+import time
+
+from toon_py import decode, encode
+
+
+def make_document(count: int) -> dict:
+    statuses = ["active", "pending", "closed"]
+    return {
+        "items": [
+            {"id": i, "name": f"user {i}", "score": i * 0.5, "status": statuses[i % 3], "active": i % 2 == 0}
+            for i in range(count)
+        ],
+        "orders": [
+            {"id": i, "customer": {"name": f"c{i}", "tier": "gold"}, "lines": [i, i + 1, i + 2]}
+            for i in range(count // 10)
+        ],
+    }
+
+
+def best_of(func, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'rows':>10} {'toon (s)':>10} {'json (s)':>10} {'ratio':>8} {'toon MB/s':>10}")
+    for count in sizes:
+        data = make_document(count)
+        toon_text = encode(data)
+        json_text = json.dumps(data)
+        assert decode(toon_text) == json.loads(json_text)
+
+        toon_time = best_of(lambda: decode(toon_text))
+        json_time = best_of(lambda: json.loads(json_text))
+        megabytes = len(toon_text) / 1_000_000
+        print(
+            f"{count:>10} {toon_time:>10.4f} {json_time:>10.4f} "
+            f"{toon_time / json_time:>8.1f} {megabytes / toon_time:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,50 @@
+"""Per-type cell formatting throughput.
+
+Run with: uv run python benchmarks/formatting.py [cells]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import UUID
+
+from toon_py import Encoder, encode
+
+COLUMNS = {
+    "int": lambda i: i * 7919,
+    "float": lambda i: i * 0.25,
+    "whole float": lambda i: float(i),
+    "str": lambda i: f"user{i}",
+    "bool": lambda i: i % 2 == 0,
+    "none": lambda i: None,
+    "decimal": lambda i: Decimal(i) / 100,
+    "datetime": lambda i: datetime(2025, 1, 1) + timedelta(seconds=i),
+    "uuid": lambda i: UUID(int=i),
+}
+
+
+def best_of(func, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(cells: int) -> None:
+    format_value = Encoder().format_value
+    rows = cells // 10
+
+    print(f"{'type':>12} {'format ns/cell':>16} {'table ns/cell':>15}")
+    for name, make in COLUMNS.items():
+        values = [make(i) for i in range(cells)]
+        format_time = best_of(lambda: list(map(format_value, values)))
+        table = {"rows": [dict(zip("abcdefghij", values[i:i + 10])) for i in range(0, rows * 10, 10)]}
+        table_time = best_of(lambda: encode(table))
+        print(f"{name:>12} {format_time / cells * 1e9:>16.1f} {table_time / (rows * 10) * 1e9:>15.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
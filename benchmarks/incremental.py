@@ -0,0 +1,50 @@
+"""Per-turn cost of re-encoding a mostly unchanged document with a fragment cache.
+
+Run with: uv run python benchmarks/incremental.py [catalog_rows]
+
+Simulates an agent loop: a large static catalog plus a small section that changes every turn.
+Each turn is encoded without a cache, with content-hashed fragments and with a Versioned catalog.
+"""
+
+import sys
+import time
+
+from toon_py import Encoder, EncodeOptions, Versioned
+
+
+def catalog(count: int) -> dict:
+    return {
+        "products": [{"sku": f"SKU-{i:06}", "name": f"Product {i}", "price": i * 0.25, "stock": i % 97} for i in range(count)],
+        "categories": {f"cat{i}": {"title": f"Category {i}", "parents": [i // 10, i // 100]} for i in range(count // 100)},
+    }
+
+
+def turn_section(turn: int, changed: int) -> dict:
+    return {"turn": turn, "messages": [{"role": "user", "text": f"message {turn}-{i}"} for i in range(changed)]}
+
+
+def per_turn(encoder: Encoder, make_document, turns: int = 5) -> float:
+    encoder.encode(make_document(0))
+    best = float("inf")
+    for turn in range(1, turns + 1):
+        document = make_document(turn)
+        start = time.perf_counter()
+        encoder.encode(document)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(rows: int) -> None:
+    static = catalog(rows)
+    options = EncodeOptions(fragment_cache_lines=4 * rows)
+
+    print(f"{'changed rows':>12} {'no cache':>10} {'hashed':>10} {'versioned':>10}")
+    for changed in (10, 1_000, rows // 2):
+        plain = per_turn(Encoder(), lambda turn: {"catalog": static, "session": turn_section(turn, changed)})
+        hashed = per_turn(Encoder(options), lambda turn: {"catalog": static, "session": turn_section(turn, changed)})
+        versioned = per_turn(Encoder(options), lambda turn: {"catalog": Versioned(static, 1), "session": turn_section(turn, changed)})
+        print(f"{changed:>12,} {plain * 1000:>8.1f}ms {hashed * 1000:>8.1f}ms {versioned * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
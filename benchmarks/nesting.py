@@ -0,0 +1,42 @@
+"""Encoding time per line as nesting depth grows at a constant line count.
+
+Run with: uv run python benchmarks/nesting.py [lines]
+"""
+
+import sys
+import time
+
+from toon_py import encode
+
+
+def make_document(depth: int, width: int) -> dict:
+    node = {"rows": [{"id": i, "name": f"leaf{i}", "tags": ["x", "y"]} for i in range(width)]}
+    for level in range(depth):
+        node = {"items": [{"level": level, "child": node, "note": "n"}, level]}
+    return node
+
+
+def best_of(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(lines: int) -> None:
+    print(f"{'depth':>6} {'lines':>8} {'time (s)':>10} {'us/line':>8}")
+    for depth in (1, 10, 50, 200, 800):
+        width = (lines - 1 - 5 * depth) // 3
+        if width < 0:
+            break
+        data = make_document(depth, width)
+        count = encode(data).count("\n") + 1
+        elapsed = best_of(lambda: encode(data))
+        print(f"{depth:>6} {count:>8} {elapsed:>10.4f} {elapsed / count * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    sys.setrecursionlimit(10_000)
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 30_001)
@@ -0,0 +1,152 @@
+"""Encoder throughput and memory suite with a stored baseline.
+
+Run with: uv run python benchmarks/suite.py [--rows N ...] [--save-baseline] [--check]
+
+Each case is timed against json.dumps on the same data. The baseline stores the TOON/JSON time
+ratio and peak traced memory per row, both of which carry over between machines far better than
+absolute timings. --check exits non-zero when a case is slower or larger than the baseline by more
+than --tolerance.
+"""
+
+import argparse
+import json
+import random
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+from toon_py import encode
+
+BASELINE = Path(__file__).with_name("baseline.json")
+WORDS = ["alpha", "beta", "gamma", "delta", "north, east", "x: y", "  padded ", "true", "0042", "ünïcode"]
+
+
+def wide_table(count: int) -> dict:
+    rng = random.Random(1)
+    return {"rows": [{f"col{j}": rng.randint(0, 10_000) if j % 2 else f"v{i}-{j}" for j in range(24)} for i in range(count)]}
+
+
+def deep_nesting(count: int) -> dict:
+    def branch(i: int, depth: int) -> dict:
+        if depth == 0:
+            return {"id": i, "tags": ["a", "b"], "ok": i % 2 == 0}
+        return {"level": depth, "child": branch(i, depth - 1)}
+
+    return {"items": [branch(i, 8) for i in range(count)]}
+
+
+def string_heavy(count: int) -> dict:
+    rng = random.Random(2)
+    return {"rows": [{"name": rng.choice(WORDS), "note": " ".join(rng.choices(WORDS, k=6)), "code": f"{rng.randint(0, 999):03}"} for _ in range(count)]}
+
+
+def number_heavy(count: int) -> dict:
+    rng = random.Random(3)
+    return {"rows": [{"i": rng.randint(-10**9, 10**9), "f": rng.uniform(-1e6, 1e6), "w": float(rng.randint(0, 100)), "s": rng.random()} for _ in range(count)]}
+
+
+def mixed_arrays(count: int) -> list:
+    rng = random.Random(4)
+    shapes = [
+        lambda i: {"id": i, "values": [i, i + 1], "meta": {"k": "v"}},
+        lambda i: [i, str(i), None],
+        lambda i: f"item {i}",
+        lambda i: {"id": i, "rows": [{"a": i, "b": "x"}, {"a": -i, "b": "y"}]},
+    ]
+    return [rng.choice(shapes)(i) for i in range(count)]
+
+
+CASES = {
+    "wide_table": wide_table,
+    "deep_nesting": deep_nesting,
+    "string_heavy": string_heavy,
+    "number_heavy": number_heavy,
+    "mixed_arrays": mixed_arrays,
+}
+
+
+def best_of_pair(first, second, repeat: int = 3) -> tuple[float, float]:
+    timers = [timeit.Timer(first), timeit.Timer(second)]
+    numbers = [timer.autorange()[0] for timer in timers]
+    best = [float("inf"), float("inf")]
+    for _ in range(repeat):
+        for i, (timer, number) in enumerate(zip(timers, numbers)):
+            best[i] = min(best[i], timer.timeit(number) / number)
+    return best[0], best[1]
+
+
+def peak_memory(func) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(make, count: int, repeat: int) -> dict:
+    data = make(count)
+    megabytes = len(encode(data).encode("utf-8")) / 1_000_000
+    toon_time, json_time = best_of_pair(lambda: encode(data), lambda: json.dumps(data), repeat)
+    peak = peak_memory(lambda: encode(data))
+    return {
+        "rows_per_sec": count / toon_time,
+        "mb_per_sec": megabytes / toon_time,
+        "json_ratio": toon_time / json_time,
+        "peak_bytes_per_row": peak / count,
+    }
+
+
+def check(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        for metric in ("json_ratio", "peak_bytes_per_row"):
+            if result[metric] > expected[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {result[metric]:.2f} vs baseline {expected[metric]:.2f}")
+    return regressions
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'case':>24} {'rows/s':>12} {'MB/s':>8} {'vs json':>8} {'peak B/row':>11}")
+    for case in args.cases:
+        for count in args.rows:
+            name = f"{case}/{count}"
+            result = results[name] = run_case(CASES[case], count, args.repeat)
+            print(
+                f"{name:>24} {result['rows_per_sec']:>12,.0f} {result['mb_per_sec']:>8.1f} "
+                f"{result['json_ratio']:>7.1f}x {result['peak_bytes_per_row']:>11,.0f}"
+            )
+
+    if args.save_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+
+    if args.check:
+        regressions = check(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,41 @@
+"""Tabular shape detection and encoding throughput.
+
+Run with: uv run python benchmarks/tabular.py [rows ...]
+"""
+
+import sys
+import time
+
+from toon_py import encode
+from toon_py.encoder import classify_array
+
+
+def make_rows(count: int) -> list[dict]:
+    statuses = ["active", "pending", "closed"]
+    return [
+        {"id": i, "name": f"user{i}", "score": i * 0.5, "status": statuses[i % 3], "active": i % 2 == 0}
+        for i in range(count)
+    ]
+
+
+def best_of(func, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'rows':>10} {'classify (s)':>14} {'encode (s)':>12} {'rows/s':>14}")
+    for count in sizes:
+        rows = make_rows(count)
+        data = {"items": rows}
+        classify_time = best_of(lambda: classify_array(rows))
+        encode_time = best_of(lambda: encode(data))
+        print(f"{count:>10} {classify_time:>14.4f} {encode_time:>12.4f} {count / encode_time:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -1,5 +1,78 @@
-from .encoder import encode
-from .types import EncodeOptions
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-__all__ = ["encode", "EncodeOptions"]
+if TYPE_CHECKING:
+    from .aio import aencode, aiter_encode
+    from .budget import encode_with_budget
+    from .decoder import ToonDecodeError, decode, decode_from, iter_rows
+    from .encoder import Encoder, encode, encode_columns, encode_to, iter_encode
+    from .formatters import register_formatter
+    from .fragments import FragmentCache, Versioned
+    from .profiling import profile
+    from .tokens import BpeEstimator, estimate_tokens, stats
+    from .types import BudgetReport, EncodeOptions, EncodeProfile, EncodeStats
+
+EXPORTS = {
+    "Encoder": "encoder",
+    "encode": "encoder",
+    "encode_columns": "encoder",
+    "encode_to": "encoder",
+    "iter_encode": "encoder",
+    "encode_with_budget": "budget",
+    "aencode": "aio",
+    "aiter_encode": "aio",
+    "register_formatter": "formatters",
+    "FragmentCache": "fragments",
+    "Versioned": "fragments",
+    "decode": "decoder",
+    "decode_from": "decoder",
+    "iter_rows": "decoder",
+    "ToonDecodeError": "decoder",
+    "profile": "profiling",
+    "stats": "tokens",
+    "estimate_tokens": "tokens",
+    "BpeEstimator": "tokens",
+    "EncodeOptions": "types",
+    "EncodeStats": "types",
+    "EncodeProfile": "types",
+    "BudgetReport": "types",
+}
+
+__all__ = [
+    "BpeEstimator",
+    "BudgetReport",
+    "EncodeOptions",
+    "EncodeProfile",
+    "EncodeStats",
+    "Encoder",
+    "FragmentCache",
+    "ToonDecodeError",
+    "Versioned",
+    "aencode",
+    "aiter_encode",
+    "decode",
+    "decode_from",
+    "encode",
+    "encode_columns",
+    "encode_to",
+    "encode_with_budget",
+    "estimate_tokens",
+    "iter_encode",
+    "iter_rows",
+    "profile",
+    "register_formatter",
+    "stats",
+]
 __version__ = "1.0.1"
+
+
+def __getattr__(name: str):
+    if name not in EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *EXPORTS])
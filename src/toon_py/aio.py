@@ -0,0 +1,24 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator
+
+from .encoder import encode, iter_encode
+from .types import EncodeOptions
+
+
+async def aiter_encode(value: Any, options: EncodeOptions | None = None, chunk_size: int = 16384) -> AsyncIterator[str]:
+    for chunk in iter_encode(value, options, chunk_size):
+        yield chunk
+        await asyncio.sleep(0)
+
+
+async def aencode(
+    value: Any,
+    options: EncodeOptions | None = None,
+    chunk_size: int = 16384,
+    offload: bool = False,
+    executor: Executor | None = None,
+) -> str:
+    if offload or executor is not None:
+        return await asyncio.get_running_loop().run_in_executor(executor, encode, value, options)
+    return "".join([chunk async for chunk in aiter_encode(value, options, chunk_size)])
@@ -0,0 +1,154 @@
+from dataclasses import replace
+from typing import Any, Callable, Iterator
+
+from .encoder import Encoder
+from .fragments import Versioned
+from .records import get_plan, is_array_type
+from .tokens import estimate_tokens
+from .types import ArrayShape, BudgetReport, EncodeOptions
+
+
+class BudgetEncoder(Encoder):
+    def __init__(
+        self,
+        options: EncodeOptions | None = None,
+        max_chars: int | None = None,
+        max_tokens: int | None = None,
+        estimator: Callable[[str], int] | None = None,
+    ):
+        super().__init__(replace(options or EncodeOptions(), memo_lines=0, fragment_cache_lines=0))
+        self.plain = Encoder(self.options)
+        self.max_chars = max_chars
+        self.max_tokens = max_tokens
+        self.estimator = estimator or estimate_tokens
+        self.chars = -1
+        self.tokens = 0
+        self.exhausted = False
+        self.path: list[str] = []
+        self.truncated_arrays: list[tuple[str, int, int]] = []
+        self.dropped_fields: list[str] = []
+
+    def charge(self, text: str) -> bool:
+        if self.exhausted:
+            return False
+
+        chars = self.chars + len(text)
+        tokens = self.tokens + self.estimator(text) if self.max_tokens is not None else 0
+        if (self.max_chars is not None and chars > self.max_chars) or (self.max_tokens is not None and tokens > self.max_tokens):
+            self.exhausted = True
+            return False
+
+        self.chars = chars
+        self.tokens = tokens
+        return True
+
+    def field_path(self) -> str:
+        return ".".join(self.path)
+
+    def encode_field(self, prefix: str, quoted_key: str, value: Any, indent_level: int) -> Iterator[str]:
+        if type(value) is Versioned:
+            value = value.value
+        self.path.append(quoted_key)
+
+        if self.exhausted:
+            self.dropped_fields.append(self.field_path())
+        elif isinstance(value, list) or is_array_type(type(value)):
+            yield from super().encode_field(prefix, quoted_key, value, indent_level)
+        else:
+            lines = super().encode_field(prefix, quoted_key, value, indent_level)
+            first = next(lines)
+            if self.charge(first + "\n"):
+                yield first
+                yield from lines
+            else:
+                self.dropped_fields.append(self.field_path())
+
+        self.path.pop()
+
+    def encode_array_field(self, prefix: str, quoted_key: str, items: list, shape: ArrayShape, keys: tuple | None, indent_level: int) -> Iterator[str]:
+        return self.encode_truncated(f"{prefix}{quoted_key}", items, shape, keys, indent_level, indent_level + 1)
+
+    def encode_array(self, items: list, indent_level: int, shape: ArrayShape | None = None, keys: tuple | None = None) -> Iterator[str]:
+        if shape is None:
+            shape, keys = self.classify_array(items)
+        return self.encode_truncated("", items, shape, keys, indent_level - 1, indent_level + 1)
+
+    def encode_truncated(self, head: str, items: list, shape: ArrayShape, keys: tuple | None, rows_level: int, list_level: int) -> Iterator[str]:
+        plain = self.plain
+        total = len(items)
+
+        if shape == "empty":
+            header = f"{head}{plain.empty_header}"
+        elif shape == "tabular":
+            header = plain.tabular_header(head, keys, total)
+        else:
+            header = f"{head}{plain.array_header(total)}:"
+
+        if not self.charge(header + "\n"):
+            self.dropped_fields.append(self.field_path())
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+            return
+        if shape == "empty":
+            yield header
+            return
+
+        if shape == "primitive":
+            values = []
+            for value in map(plain.format_value, items):
+                if not self.charge(value + " "):
+                    break
+                values.append(value)
+            count = len(values)
+        else:
+            if shape == "tabular":
+                groups = plain.format_tabular_rows(items, keys, rows_level)
+            else:
+                groups = ("\n".join(plain.format_list_array([item], list_level)) for item in items)
+            values = []
+            for group in groups:
+                if not self.charge(group + "\n"):
+                    break
+                values.append(group)
+            count = len(values)
+
+        if count < total:
+            self.truncated_arrays.append((self.field_path(), count, total))
+
+        if count == 0:
+            yield f"{head}{plain.empty_header}"
+        elif shape == "primitive":
+            yield f"{head}{plain.array_header(count)}: {plain.delimiter.join(values)}"
+        else:
+            yield plain.tabular_header(head, keys, count) if shape == "tabular" else f"{head}{plain.array_header(count)}:"
+            yield from values
+
+    def iter_lines(self, value: Any) -> Iterator[str]:
+        if type(value) is Versioned:
+            value = value.value
+        lines = super().iter_lines(value)
+        if isinstance(value, (dict, list)) or get_plan(type(value)) is not None or is_array_type(type(value)):
+            return lines
+        return (line for line in lines if self.charge(line + "\n"))
+
+    def encode_report(self, value: Any) -> BudgetReport:
+        text = self.encode(value)
+        return BudgetReport(
+            text=text,
+            truncated=self.exhausted,
+            chars=len(text),
+            tokens=self.tokens if self.max_tokens is not None else None,
+            truncated_arrays=self.truncated_arrays,
+            dropped_fields=self.dropped_fields,
+        )
+
+
+def encode_with_budget(
+    value: Any,
+    options: EncodeOptions | None = None,
+    max_chars: int | None = None,
+    max_tokens: int | None = None,
+    estimator: Callable[[str], int] | None = None,
+) -> BudgetReport:
+    return BudgetEncoder(options, max_chars, max_tokens, estimator).encode_report(value)
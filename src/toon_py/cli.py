@@ -1,89 +1,341 @@
 import json
+import os
 import sys
-from pathlib import Path
-from typing import Optional
+from itertools import islice
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, TextIO
 
-import typer
-from rich.console import Console
-
-from .encoder import encode
+from .encoder import Encoder, encode, iter_chunks, iter_encode
 from .types import EncodeOptions
 
-console = Console()
-
-
-def main_command(
-    input_source: Optional[str] = typer.Argument(
-        None, help="JSON file path, JSON string, or read from stdin if not provided"
-    ),
-    indent: int = typer.Option(2, "--indent", "-i", help="Number of spaces per indentation level"),
-    delimiter: str = typer.Option(
-        "comma",
-        "--delimiter",
-        "-d",
-        help="Delimiter for arrays: comma, tab, or pipe",
-    ),
-    length_marker: bool = typer.Option(
-        False, "--length-marker", "-l", help="Add '#' prefix to array lengths"
-    ),
-    output: Optional[str] = typer.Option(
-        None, "--output", "-o", help="Output file path (default: stdout)"
-    ),
-):
+if TYPE_CHECKING:
+    from .tokens import TokenCounter
+
+MMAP_THRESHOLD = 64 * 1024 * 1024
+STATS_CHUNK = 1 << 20
+
+DELIMITERS = {
+    "comma": ",",
+    "tab": "\t",
+    "pipe": "|",
+    ",": ",",
+    "\t": "\t",
+    "|": "|",
+}
+
+VALUE_OPTIONS = {
+    "-i": ("indent", int),
+    "--indent": ("indent", int),
+    "-d": ("delimiter", str),
+    "--delimiter": ("delimiter", str),
+    "-o": ("output", str),
+    "--output": ("output", str),
+    "-j": ("jobs", int),
+    "--jobs": ("jobs", int),
+    "--batch-size": ("batch_size", int),
+    "--record-separator": ("record_separator", str),
+}
+
+FLAG_OPTIONS = {
+    "-l": "length_marker",
+    "--length-marker": "length_marker",
+    "--ndjson": "ndjson",
+    "--stats": "stats",
+}
+
+
+class CliError(Exception):
+    pass
+
+
+def print_message(message: str, style: str) -> None:
+    if sys.stdout.isatty():
+        from rich.console import Console
+
+        Console().print(f"[{style}]{message}[/{style}]")
+    else:
+        print(message)
+
+
+def iter_batches(lines: Iterable[str], batch_size: int) -> Iterator[list[str]]:
+    lines = iter(lines)
+    while batch := list(islice(lines, batch_size)):
+        yield batch
+
+
+def encode_ndjson_batch(lines: list[str], options: EncodeOptions) -> list[str]:
+    records = [json.loads(line) for line in lines if line.strip()]
+    return Encoder(options).encode_many(records)
+
+
+def iter_ndjson_records(lines: Iterable[str], options: EncodeOptions, jobs: int = 1, batch_size: int = 1000) -> Iterator[str]:
+    batches = iter_batches(lines, batch_size)
+
+    if jobs <= 1:
+        for batch in batches:
+            yield from encode_ndjson_batch(batch, options)
+        return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for batch in batches:
+            pending.append(executor.submit(encode_ndjson_batch, batch, options))
+            if len(pending) >= jobs * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def write_ndjson(lines: Iterable[str], out: TextIO, options: EncodeOptions, jobs: int, batch_size: int, separator: str) -> int:
+    count = 0
+    for record in iter_ndjson_records(lines, options, jobs, batch_size):
+        if count:
+            out.write(separator)
+        out.write(record)
+        count += 1
+    if count:
+        out.write("\n")
+    return count
+
+
+def run_ndjson(input_source: Optional[str], output: Optional[str], options: EncodeOptions, jobs: int, batch_size: int, separator: str) -> None:
+    if input_source is None:
+        if sys.stdin.isatty():
+            raise CliError("No input provided. Use a file or pipe NDJSON via stdin.")
+        lines = sys.stdin
+    else:
+        lines = open(input_source)
+
     try:
-        if input_source is None:
-            if sys.stdin.isatty():
-                console.print("[red]Error: No input provided. Use a file, JSON string, or pipe data via stdin.[/red]")
-                raise typer.Exit(1)
-            json_data = sys.stdin.read()
+        if output:
+            with open(output, "w") as out:
+                count = write_ndjson(lines, out, options, jobs, batch_size, separator)
+            print_message(f"{count} TOON records written to {output}", "green")
         else:
-            input_path = Path(input_source)
-            if input_path.exists() and input_path.is_file():
-                json_data = input_path.read_text()
-            else:
-                json_data = input_source
+            write_ndjson(lines, sys.stdout, options, jobs, batch_size, separator)
+    except json.JSONDecodeError as e:
+        raise CliError(f"Invalid JSON record - {e}")
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+
+
+def print_stats(toon: "TokenCounter", source: "TokenCounter") -> None:
+    from .types import EncodeStats
+
+    report = EncodeStats(chars=toon.chars, tokens=toon.tokens, json_chars=source.chars, json_tokens=source.tokens)
+    print(f"TOON: {report.chars:,} chars, ~{report.tokens:,} tokens", file=sys.stderr)
+    print(f"JSON: {report.json_chars:,} chars, ~{report.json_tokens:,} tokens", file=sys.stderr)
+    print(f"Saved: {report.token_savings:.1%} tokens", file=sys.stderr)
+
+
+def looks_like_json(text: str) -> bool:
+    return text.lstrip()[:1] in ("{", "[", '"')
+
+
+def run_stream(path: str, output: Optional[str], options: EncodeOptions, stats: bool = False) -> None:
+    import mmap
+
+    from .jsonstream import JsonReader, iter_compact, iter_json_lines
 
+    with open(path, "rb") as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        chunks = iter_chunks(iter_json_lines(JsonReader(data), Encoder(options)))
+        if stats:
+            from .tokens import TokenCounter
+
+            toon = TokenCounter()
+            chunks = toon.count(chunks)
         try:
-            data = json.loads(json_data)
+            if output:
+                with open(output, "w") as out:
+                    out.writelines(chunks)
+                print_message(f"TOON output written to {output}", "green")
+            else:
+                sys.stdout.writelines(chunks)
+                sys.stdout.write("\n")
         except json.JSONDecodeError as e:
-            console.print(f"[red]Error: Invalid JSON - {e}[/red]")
-            raise typer.Exit(1)
-
-        delimiter_map = {
-            "comma": ",",
-            "tab": "\t",
-            "pipe": "|",
-            ",": ",",
-            "\t": "\t",
-            "|": "|",
-        }
-
-        if delimiter not in delimiter_map:
-            console.print(f"[red]Error: Invalid delimiter '{delimiter}'. Use: comma, tab, or pipe[/red]")
-            raise typer.Exit(1)
-
-        options = EncodeOptions(
-            indent=indent,
-            delimiter=delimiter_map[delimiter],
-            length_marker="#" if length_marker else False,
-        )
+            raise CliError(f"Invalid JSON - {e}")
+
+        if stats:
+            import codecs
+
+            source = TokenCounter()
+            blocks = (data[start:start + STATS_CHUNK] for start in range(0, len(data), STATS_CHUNK))
+            for text in iter_compact(codecs.iterdecode(blocks, "utf-8")):
+                source.feed(text)
+            print_stats(toon, source)
+
+
+def run(
+    input_source: Optional[str] = None,
+    indent: int = 2,
+    delimiter: str = "comma",
+    length_marker: bool = False,
+    output: Optional[str] = None,
+    ndjson: bool = False,
+    jobs: int = 1,
+    batch_size: int = 1000,
+    record_separator: str = "\\n\\n",
+    stats: bool = False,
+) -> None:
+    if delimiter not in DELIMITERS:
+        raise CliError(f"Invalid delimiter '{delimiter}'. Use: comma, tab, or pipe")
+
+    options = EncodeOptions(
+        indent=indent,
+        delimiter=DELIMITERS[delimiter],
+        length_marker="#" if length_marker else False,
+    )
 
+    if ndjson:
+        if stats:
+            raise CliError("--stats cannot be combined with --ndjson")
+
+        import codecs
+
+        separator = codecs.decode(record_separator, "unicode_escape")
+        run_ndjson(input_source, output, options, jobs, batch_size, separator)
+        return
+
+    if input_source is None:
+        if sys.stdin.isatty():
+            raise CliError("No input provided. Use a file, JSON string, or pipe data via stdin.")
+        json_data = sys.stdin.read()
+    elif looks_like_json(input_source) or not os.path.isfile(input_source):
+        json_data = input_source
+    elif os.path.getsize(input_source) >= max(MMAP_THRESHOLD, 1):
+        run_stream(input_source, output, options, stats)
+        return
+    else:
+        with open(input_source) as fp:
+            json_data = fp.read()
+
+    try:
+        data = json.loads(json_data)
+    except json.JSONDecodeError as e:
+        raise CliError(f"Invalid JSON - {e}")
+
+    if stats:
+        from .tokens import TokenCounter, iter_json
+
+        toon = TokenCounter()
+        source = TokenCounter()
+        for chunk in iter_json(data):
+            source.feed(chunk)
+        result = "".join(toon.count(iter_encode(data, options)))
+    else:
         result = encode(data, options)
 
-        if output:
-            output_path = Path(output)
-            output_path.write_text(result)
-            console.print(f"[green]TOON output written to {output}[/green]")
-        else:
-            print(result)
+    if output:
+        with open(output, "w") as fp:
+            fp.write(result)
+        print_message(f"TOON output written to {output}", "green")
+    else:
+        print(result)
+
+    if stats:
+        print_stats(toon, source)
+
 
+def run_safely(**kwargs) -> int:
+    try:
+        run(**kwargs)
     except Exception as e:
-        console.print(f"[red]Error: {e}[/red]")
-        raise typer.Exit(1)
+        print_message(f"Error: {e}", "red")
+        return 1
+    return 0
+
+
+def parse_args(args: list[str]) -> dict | None:
+    kwargs = {}
+    args = iter(args)
+
+    for arg in args:
+        name, has_value, value = arg.partition("=") if arg.startswith("--") else (arg, False, None)
+        if name in FLAG_OPTIONS and not has_value:
+            kwargs[FLAG_OPTIONS[name]] = True
+        elif name in VALUE_OPTIONS:
+            key, convert = VALUE_OPTIONS[name]
+            if not has_value:
+                value = next(args, None)
+                if value is None:
+                    return None
+            try:
+                kwargs[key] = convert(value)
+            except ValueError:
+                return None
+        elif arg.startswith("-") or "input_source" in kwargs:
+            return None
+        else:
+            kwargs["input_source"] = arg
+
+    return kwargs
+
+
+def typer_main(args: list[str] | None = None) -> None:
+    import typer
+
+    def main_command(
+        input_source: Optional[str] = typer.Argument(
+            None, help="JSON file path, JSON string, or read from stdin if not provided"
+        ),
+        indent: int = typer.Option(2, "--indent", "-i", help="Number of spaces per indentation level"),
+        delimiter: str = typer.Option(
+            "comma",
+            "--delimiter",
+            "-d",
+            help="Delimiter for arrays: comma, tab, or pipe",
+        ),
+        length_marker: bool = typer.Option(
+            False, "--length-marker", "-l", help="Add '#' prefix to array lengths"
+        ),
+        output: Optional[str] = typer.Option(
+            None, "--output", "-o", help="Output file path (default: stdout)"
+        ),
+        ndjson: bool = typer.Option(
+            False, "--ndjson", help="Treat input as newline-delimited JSON and encode each record"
+        ),
+        jobs: int = typer.Option(1, "--jobs", "-j", help="Worker processes for --ndjson"),
+        batch_size: int = typer.Option(1000, "--batch-size", help="Records per worker batch for --ndjson"),
+        record_separator: str = typer.Option(
+            "\\n\\n", "--record-separator", help="Separator between --ndjson records (backslash escapes allowed)"
+        ),
+        stats: bool = typer.Option(False, "--stats", help="Print TOON vs JSON size and estimated tokens to stderr"),
+    ):
+        exit_code = run_safely(
+            input_source=input_source,
+            indent=indent,
+            delimiter=delimiter,
+            length_marker=length_marker,
+            output=output,
+            ndjson=ndjson,
+            jobs=jobs,
+            batch_size=batch_size,
+            record_separator=record_separator,
+            stats=stats,
+        )
+        if exit_code:
+            raise typer.Exit(exit_code)
+
+    typer_app = typer.Typer(add_completion=False)
+    typer_app.command()(main_command)
+    typer_app(args=args)
+
+
+def main(args: list[str] | None = None) -> int:
+    kwargs = parse_args(sys.argv[1:] if args is None else args)
+    if kwargs is None:
+        typer_main(args)
+        return 0
+    return run_safely(**kwargs)
 
 
 def app():
-    typer.run(main_command)
+    exit_code = main()
+    if exit_code:
+        sys.exit(exit_code)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,379 @@
+import json
+import re
+from typing import Any, Iterator, TextIO
+
+HEADER = re.compile(r'\[(#?)(\d+)([\t|]?)\](?:\{(.*)\})?:(.*)\Z')
+NUMBER = re.compile(r'-?\d+(\.\d+)?([eE][+-]?\d+)?\Z')
+QUOTED = re.compile(r'"(?:[^"\\]|\\.)*"')
+UNQUOTED_KEY = re.compile(r'[^:\[]*')
+NUMBER_START = frozenset("-0123456789")
+LITERALS = {"null": None, "true": True, "false": False}
+
+
+class ToonDecodeError(ValueError):
+    def __init__(self, msg: str, lineno: int):
+        super().__init__(f"{msg} (line {lineno})")
+        self.msg = msg
+        self.lineno = lineno
+
+
+def invalid_string(error: json.JSONDecodeError, lineno: int) -> ToonDecodeError:
+    return ToonDecodeError(f"Invalid quoted string: {error.msg}", lineno)
+
+
+def unquote(token: str) -> str:
+    if "\\" in token:
+        return json.loads(token)
+    return token[1:-1]
+
+
+def parse_value(token: str) -> Any:
+    if not token:
+        return ""
+
+    first = token[0]
+    if first == '"':
+        return unquote(token)
+
+    if first in NUMBER_START:
+        match = NUMBER.match(token)
+        if match is None:
+            return token
+        return float(token) if match.lastindex else int(token)
+
+    return LITERALS.get(token, token)
+
+
+def split_values(text: str, delimiter: str, lineno: int = 0) -> list[str]:
+    if '"' not in text:
+        return text.split(delimiter)
+
+    values = []
+    pos = 0
+    end = len(text)
+    while True:
+        if pos < end and text[pos] == '"':
+            match = QUOTED.match(text, pos)
+            if match is None:
+                raise ToonDecodeError(f"Unterminated string: {text[pos:]}", lineno)
+            values.append(text[pos:match.end()])
+            pos = match.end()
+        else:
+            next_pos = text.find(delimiter, pos)
+            if next_pos == -1:
+                values.append(text[pos:])
+                return values
+            values.append(text[pos:next_pos])
+            pos = next_pos
+
+        if pos >= end:
+            return values
+        pos += len(delimiter)
+
+
+def split_key(content: str) -> tuple[str, str] | None:
+    if content[:1] == '"':
+        match = QUOTED.match(content)
+        if match is None:
+            return None
+        key = unquote(match.group())
+    else:
+        match = UNQUOTED_KEY.match(content)
+        key = match.group()
+
+    rest = content[match.end():]
+    if rest[:1] == ":":
+        if len(rest) == 1 or rest[1] == " ":
+            return key, rest
+    elif rest[:1] == "[" and HEADER.match(rest) is not None:
+        return key, rest
+    return None
+
+
+def parse_row(keys: list[str] | tuple[str, ...], values: list[str], fill_marker: str) -> dict:
+    if fill_marker in values:
+        return {key: parse_value(value) for key, value in zip(keys, values) if value != fill_marker}
+    return dict(zip(keys, map(parse_value, values)))
+
+
+def expand_row(row: dict, paths: dict[str, list[str]]) -> dict:
+    expanded = {}
+    for key, value in row.items():
+        path = paths.get(key)
+        if path is None:
+            expanded[key] = value
+            continue
+        target = expanded
+        for part in path[:-1]:
+            target = target.setdefault(part, {})
+        target[path[-1]] = value
+    return expanded
+
+
+class Decoder:
+    def __init__(self, fill_marker: str = "", expand_paths: bool = False):
+        self.lines: list[str] = []
+        self.pos = 0
+        self.indent_size = 0
+        self.fill_marker = fill_marker
+        self.expand_paths = expand_paths
+
+    def error(self, msg: str) -> ToonDecodeError:
+        return ToonDecodeError(msg, self.pos)
+
+    def next_line(self) -> tuple[int, str]:
+        if self.pos >= len(self.lines):
+            raise self.error("Unexpected end of input")
+        line = self.lines[self.pos]
+        self.pos += 1
+        content = line.lstrip(" ")
+        return len(line) - len(content), content
+
+    def peek_indent(self) -> int:
+        if self.pos >= len(self.lines):
+            return -1
+        line = self.lines[self.pos]
+        return len(line) - len(line.lstrip(" "))
+
+    def parse_object(self, indent: int, first: str | None = None) -> dict:
+        obj = {}
+        if first is not None:
+            key, value = self.parse_field(first, indent)
+            obj[key] = value
+
+        lines = self.lines
+        while self.pos < len(lines):
+            line = lines[self.pos]
+            content = line.lstrip(" ")
+            line_indent = len(line) - len(content)
+            if line_indent < indent:
+                break
+            self.pos += 1
+            if line_indent > indent:
+                raise self.error("Unexpected indentation")
+            key, value = self.parse_field(content, indent)
+            obj[key] = value
+
+        return obj
+
+    def parse_field(self, content: str, indent: int) -> tuple[str, Any]:
+        field = split_key(content)
+        if field is None:
+            raise self.error(f"Expected 'key: value', got {content!r}")
+
+        key, rest = field
+        if rest[0] == "[":
+            return key, self.parse_array(HEADER.match(rest), indent)
+        if len(rest) > 1:
+            return key, parse_value(rest[2:])
+
+        child_indent = self.peek_indent()
+        if child_indent > indent:
+            return key, self.parse_object(child_indent)
+        return key, {}
+
+    def parse_array(self, header: re.Match, indent: int) -> list:
+        _, length, delimiter, fields, tail = header.groups()
+        length = int(length)
+        delimiter = delimiter or ","
+
+        if fields is not None:
+            keys = [unquote(key) if key[:1] == '"' else key for key in split_values(fields, delimiter, self.pos)]
+            key_count = len(keys)
+            start = self.pos
+            if start + length > len(self.lines):
+                self.pos = len(self.lines)
+                raise self.error(f"Expected {length} rows")
+
+            rows = [None] * length
+            try:
+                for i, line in enumerate(self.lines[start:start + length]):
+                    values = split_values(line.lstrip(" "), delimiter, start + i + 1)
+                    if len(values) != key_count:
+                        self.pos = start + i + 1
+                        raise self.error(f"Expected {key_count} values in row, got {len(values)}")
+                    rows[i] = parse_row(keys, values, self.fill_marker)
+            except json.JSONDecodeError as e:
+                raise invalid_string(e, start + i + 1) from None
+            self.pos = start + length
+
+            if self.expand_paths:
+                paths = {key: key.split(".") for key in split_values(fields, delimiter) if key[:1] != '"' and "." in key}
+                if paths:
+                    rows = [expand_row(row, paths) for row in rows]
+            return rows
+
+        if tail:
+            values = split_values(tail[1:], delimiter, self.pos)
+            if len(values) != length:
+                raise self.error(f"Expected {length} array items, got {len(values)}")
+            return [parse_value(value) for value in values]
+
+        if length == 0:
+            return []
+
+        item_indent = self.peek_indent()
+        if item_indent <= indent:
+            raise self.error(f"Expected {length} list items")
+        return self.parse_list(length, item_indent)
+
+    def parse_list(self, length: int, indent: int) -> list:
+        items = [None] * length
+        for i in range(length):
+            line_indent, content = self.next_line()
+            if line_indent != indent or content[:1] != "-" or content[1:2] not in ("", " "):
+                raise self.error(f"Expected list item {i + 1} of {length}")
+            items[i] = self.parse_item(content[2:], indent)
+        return items
+
+    def parse_item(self, body: str, indent: int) -> Any:
+        if not body:
+            return {}
+        if body[0] == "[":
+            header = HEADER.match(body)
+            if header is not None:
+                return self.parse_array(header, indent)
+        if split_key(body) is not None:
+            return self.parse_object(indent + self.indent_size, body)
+        return parse_value(body)
+
+    def decode(self, text: str) -> Any:
+        if "\r" in text:
+            text = text.replace("\r\n", "\n")
+        lines = text.strip("\n").split("\n")
+        if "\n\n" in text:
+            lines = [line for line in lines if line.strip()]
+        if not lines or lines == [""]:
+            return {}
+
+        self.lines = lines
+        self.pos = 0
+        self.indent_size = 0
+        for line in lines:
+            if line[:1] == " ":
+                self.indent_size = len(line) - len(line.lstrip(" "))
+                break
+
+        first = lines[0]
+        header = HEADER.match(first) if first[:1] == "[" else None
+        try:
+            if header is not None:
+                self.pos = 1
+                value = self.parse_array(header, 0)
+            elif split_key(first) is not None:
+                value = self.parse_object(0)
+            else:
+                self.pos = 1
+                value = parse_value(first)
+        except json.JSONDecodeError as e:
+            raise invalid_string(e, max(self.pos, 1)) from None
+
+        if self.pos < len(lines):
+            raise self.error("Unexpected trailing content")
+        return value
+
+
+def decode(text: str, fill_marker: str = "", expand_paths: bool = False) -> Any:
+    return Decoder(fill_marker, expand_paths).decode(text)
+
+
+def decode_from(fp: TextIO, fill_marker: str = "", expand_paths: bool = False) -> Any:
+    return Decoder(fill_marker, expand_paths).decode(fp.read())
+
+
+class TabularRows:
+    def __init__(self, fp: TextIO, path: str | tuple[str, ...] = "items", as_tuples: bool = False, fill_marker: str = ""):
+        self.lines = iter(fp)
+        self.lineno = 0
+        self.path = tuple(path.split(".")) if isinstance(path, str) and path else tuple(path)
+        self.as_tuples = as_tuples
+        self.fill_marker = fill_marker
+        self.keys, self.length, self.delimiter = self.find_header()
+
+    def next_line(self) -> str | None:
+        for line in self.lines:
+            self.lineno += 1
+            line = line.rstrip("\r\n")
+            if line.strip():
+                return line
+        return None
+
+    def find_header(self) -> tuple[tuple[str, ...], int, str]:
+        try:
+            return self.scan_header()
+        except json.JSONDecodeError as e:
+            raise invalid_string(e, self.lineno) from None
+
+    def scan_header(self) -> tuple[tuple[str, ...], int, str]:
+        stack: list[tuple[int, str | None]] = []
+
+        while (line := self.next_line()) is not None:
+            content = line.lstrip(" ")
+            indent = len(line) - len(content)
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+
+            if content.startswith("- "):
+                content = content[2:]
+            if content[:1] == "[" and indent == 0:
+                key, rest = None, content
+            else:
+                field = split_key(content)
+                if field is None:
+                    continue
+                key, rest = field
+
+            if rest == ":":
+                stack.append((indent, key))
+                continue
+            if rest[0] != "[":
+                continue
+
+            header = HEADER.match(rest)
+            if header is None:
+                continue
+            _, length, delimiter, fields, tail = header.groups()
+            length = int(length)
+            if fields is None:
+                if not tail and length:
+                    stack.append((indent, None))
+                continue
+
+            delimiter = delimiter or ","
+            parents = tuple(parent for _, parent in stack)
+            target = () if key is None else (*parents, key)
+            if target == self.path and None not in parents:
+                keys = tuple(unquote(k) if k[:1] == '"' else k for k in split_values(fields, delimiter, self.lineno))
+                return keys, length, delimiter
+
+            for _ in range(length):
+                self.next_line()
+
+        raise ToonDecodeError(f"Tabular array {'.'.join(self.path)!r} not found", self.lineno)
+
+    def __iter__(self) -> Iterator[tuple | dict]:
+        keys = self.keys
+        key_count = len(keys)
+        delimiter = self.delimiter
+        as_tuples = self.as_tuples
+        fill_marker = self.fill_marker
+
+        for _ in range(self.length):
+            line = self.next_line()
+            if line is None:
+                raise ToonDecodeError(f"Expected {self.length} rows", self.lineno)
+            values = split_values(line.lstrip(" "), delimiter, self.lineno)
+            if len(values) != key_count:
+                raise ToonDecodeError(f"Expected {key_count} values in row, got {len(values)}", self.lineno)
+            try:
+                if as_tuples:
+                    row = tuple(None if value == fill_marker else parse_value(value) for value in values)
+                else:
+                    row = parse_row(keys, values, fill_marker)
+            except json.JSONDecodeError as e:
+                raise invalid_string(e, self.lineno) from None
+            yield row
+
+
+def iter_rows(fp: TextIO, path: str | tuple[str, ...] = "items", as_tuples: bool = False, fill_marker: str = "") -> TabularRows:
+    return TabularRows(fp, path, as_tuples, fill_marker)
@@ -1,10 +1,24 @@
 import math
-from datetime import datetime, date
-from decimal import Decimal
-from typing import Any
+import sys
+from array import array
+from collections.abc import Mapping, Sequence, Sized
+from dataclasses import replace
+from functools import partial
+from itertools import islice, repeat
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Iterable, Iterator, TextIO
 
-from .types import EncodeOptions
-from .quoting import quote_if_needed_key, quote_if_needed_value
+from .formatters import FORMATTERS, format_primitive_value as format_primitive_value, resolve_formatter
+from .fragments import Versioned
+from .types import ArrayShape, EncodeOptions, EncodeProfile, FoldedKey
+from .quoting import QuoteCache, is_fill_marker, needs_quoting_key, quote_if_needed_key, quote_if_needed_value
+from .profiling import ACTIVE_PROFILE, instrument
+from .records import PRIMITIVE_TYPES, RecordPlan, get_plan, is_array_type, is_nested, is_nested_type
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from .spool import SpooledArray
 
 
 def normalize_number(value: float | int) -> float | int | None:
@@ -20,300 +34,671 @@ def normalize_number(value: float | int) -> float | int | None:
     return value
 
 
-def can_use_tabular(items: list) -> bool:
-    if not items:
-        return False
-
-    if not all(isinstance(item, dict) for item in items):
-        return False
+def classify_array(items: list, sparse: float = 0.0, fold: int = 0) -> tuple[ArrayShape, tuple | None]:
+    shape, keys = classify_items(items, sparse, fold)
+    if shape == "mixed" and any(type(item) is Versioned for item in items):
+        return classify_items([item.value if type(item) is Versioned else item for item in items], sparse, fold)
+    return shape, keys
 
-    if not all(item for item in items):
-        return False
 
-    first_keys = set(items[0].keys())
-    if not all(set(item.keys()) == first_keys for item in items):
-        return False
+def classify_items(items: list, sparse: float = 0.0, fold: int = 0) -> tuple[ArrayShape, tuple | None]:
+    if not items:
+        return "empty", None
 
+    first_item = items[0]
+    if not isinstance(first_item, dict):
+        plan = get_plan(type(first_item))
+        if plan is not None:
+            return classify_records(items, plan)
+        for item in items:
+            if type(item) not in PRIMITIVE_TYPES and is_nested(item):
+                return "mixed", None
+        return "primitive", None
+
+    if not first_item:
+        return "mixed", None
+
+    first_keys = first_item.keys()
+    key_count = len(first_item)
     for item in items:
+        if not isinstance(item, dict) or len(item) != key_count or item.keys() != first_keys:
+            if sparse and isinstance(item, dict):
+                return classify_sparse(items, sparse)
+            return "mixed", None
         for value in item.values():
-            if isinstance(value, (dict, list)):
-                return False
+            if type(value) not in PRIMITIVE_TYPES and is_nested(value):
+                if fold:
+                    return classify_folded(items, fold)
+                return "mixed", None
 
-    return True
+    return "tabular", tuple(first_keys)
 
 
-def format_primitive_value(value: Any, delimiter: str) -> str:
-    if value is None:
-        return "null"
-    if isinstance(value, bool):
-        return "true" if value else "false"
-    if isinstance(value, (int, float)):
-        normalized = normalize_number(value)
-        if normalized is None:
-            return "null"
-        if isinstance(normalized, float):
-            if normalized == int(normalized):
-                return str(int(normalized))
-            return str(normalized)
-        return str(normalized)
-    if isinstance(value, Decimal):
-        return str(value)
-    if isinstance(value, (datetime, date)):
-        return quote_if_needed_value(value.isoformat(), delimiter)
-    if isinstance(value, str):
-        return quote_if_needed_value(value, delimiter)
-    return "null"
-
-
-def format_primitive_array(items: list, delimiter: str, length_marker: str | bool, indent_level: int) -> str:
-    length_prefix = f"#{len(items)}" if length_marker else str(len(items))
-
-    if delimiter == "\t":
-        delimiter_marker = "\t"
-    elif delimiter == "|":
-        delimiter_marker = "|"
-    else:
-        delimiter_marker = ""
-
-    formatted_values = delimiter.join(format_primitive_value(item, delimiter) for item in items)
-    return f"[{length_prefix}{delimiter_marker}]: {formatted_values}"
-
-
-def format_tabular_array(key: str, items: list, delimiter: str, length_marker: str | bool, indent_level: int, options: EncodeOptions) -> list[str]:
-    lines = []
+def fold_template(row: dict, depth: int, level: int = 0) -> dict | None:
+    template = {}
+    for key, value in row.items():
+        if "." in key or (level and needs_quoting_key(key)):
+            return None
+        if isinstance(value, dict):
+            if not value or level >= depth or needs_quoting_key(key):
+                return None
+            nested = fold_template(value, depth, level + 1)
+            if nested is None:
+                return None
+            template[key] = nested
+        elif type(value) not in PRIMITIVE_TYPES and is_nested(value):
+            return None
+        else:
+            template[key] = None
+    return template
 
-    if not items:
-        length_prefix = "#0" if length_marker else "0"
-        if delimiter == "\t":
-            delimiter_marker = "\t"
-        elif delimiter == "|":
-            delimiter_marker = "|"
+
+def matches_template(row: Any, template: dict) -> bool:
+    if not isinstance(row, dict) or len(row) != len(template) or row.keys() != template.keys():
+        return False
+    for key, value in row.items():
+        nested = template[key]
+        if nested is None:
+            if type(value) not in PRIMITIVE_TYPES and is_nested(value):
+                return False
+        elif not matches_template(value, nested):
+            return False
+    return True
+
+
+def template_columns(template: dict, prefix: tuple[str, ...] = ()) -> Iterator[str]:
+    for key, nested in template.items():
+        if nested is None:
+            yield FoldedKey((*prefix, key)) if prefix else key
         else:
-            delimiter_marker = ""
-        lines.append(f"{key}[{length_prefix}{delimiter_marker}]:")
-        return lines
+            yield from template_columns(nested, (*prefix, key))
 
-    first_item = items[0]
-    keys = list(first_item.keys())
 
-    length_prefix = f"#{len(items)}" if length_marker else str(len(items))
+def classify_folded(items: list, depth: int) -> tuple[ArrayShape, tuple | None]:
+    template = fold_template(items[0], depth)
+    if template is None:
+        return "mixed", None
+
+    for item in items:
+        if not matches_template(item, template):
+            return "mixed", None
+
+    return "tabular", tuple(template_columns(template))
+
+
+def is_folded(keys: tuple) -> bool:
+    return any(type(key) is FoldedKey for key in keys)
+
 
-    if delimiter == "\t":
-        delimiter_marker = "\t"
-        header_keys = "\t".join(quote_if_needed_key(k) for k in keys)
-    elif delimiter == "|":
-        delimiter_marker = "|"
-        header_keys = "|".join(quote_if_needed_key(k) for k in keys)
-    else:
-        delimiter_marker = ""
-        header_keys = ",".join(quote_if_needed_key(k) for k in keys)
+def path_getter(path: tuple[str, ...]) -> Callable[[dict], Any]:
+    if len(path) == 1:
+        return itemgetter(path[0])
+    if len(path) == 2:
+        first, second = path
+        return lambda row: row[first][second]
+    head = itemgetter(path[0])
+    rest = path_getter(path[1:])
+    return lambda row: rest(head(row))
 
-    lines.append(f"{key}[{length_prefix}{delimiter_marker}]{{{header_keys}}}:")
 
-    indent = " " * (options.indent * (indent_level + 1))
+def classify_sparse(items: list, sparse: float) -> tuple[ArrayShape, tuple | None]:
+    columns: dict = {}
+    row_keys = None
+    present = 0
     for item in items:
-        row_values = delimiter.join(format_primitive_value(item[k], delimiter) for k in keys)
-        lines.append(f"{indent}{row_values}")
+        if not isinstance(item, dict) or not item:
+            return "mixed", None
+        if item.keys() != row_keys:
+            row_keys = item.keys()
+            columns.update(dict.fromkeys(row_keys))
+        for value in item.values():
+            if type(value) not in PRIMITIVE_TYPES and is_nested(value):
+                return "mixed", None
+        present += len(item)
 
-    return lines
+    cells = len(items) * len(columns)
+    if cells - present > sparse * cells:
+        return "mixed", None
+    return "tabular", tuple(columns)
 
 
-def format_list_array(items: list, indent_level: int, options: EncodeOptions) -> list[str]:
-    lines = []
-    indent = " " * (options.indent * indent_level)
-    item_indent = " " * (options.indent * (indent_level + 1))
+def classify_records(items: list, plan: RecordPlan) -> tuple[ArrayShape, tuple | None]:
+    if not plan.fields:
+        return "mixed", None
 
+    fields = plan.fields
     for item in items:
-        if isinstance(item, dict):
-            dict_keys = list(item.keys())
-            if not dict_keys:
-                lines.append(f"{indent}- ")
-            else:
-                first_key = dict_keys[0]
-                first_value = item[first_key]
-
-                quoted_key = quote_if_needed_key(first_key)
-
-                if isinstance(first_value, list):
-                    if not first_value:
-                        length_prefix = "#0" if options.length_marker else "0"
-                        if options.delimiter == "\t":
-                            delimiter_marker = "\t"
-                        elif options.delimiter == "|":
-                            delimiter_marker = "|"
-                        else:
-                            delimiter_marker = ""
-                        lines.append(f"{indent}- {quoted_key}[{length_prefix}{delimiter_marker}]:")
-                    elif all(not isinstance(v, (dict, list)) for v in first_value):
-                        array_line = format_primitive_array(first_value, options.delimiter, options.length_marker, indent_level + 1)
-                        lines.append(f"{indent}- {quoted_key}{array_line}")
-                    elif can_use_tabular(first_value):
-                        tabular_lines = format_tabular_array(quoted_key, first_value, options.delimiter, options.length_marker, indent_level, options)
-                        lines.append(f"{indent}- {tabular_lines[0]}")
-                        for i in range(1, len(tabular_lines)):
-                            lines.append(tabular_lines[i])
-                    else:
-                        lines.append(f"{indent}- {quoted_key}:")
-                        nested_lines = format_list_array(first_value, indent_level + 2, options)
-                        lines.extend(nested_lines)
-
-                    for k in dict_keys[1:]:
-                        v = item[k]
-                        encoded_lines = encode_value(v, indent_level + 1, options)
-                        quoted_k = quote_if_needed_key(k)
-                        if isinstance(v, (dict, list)):
-                            lines.append(f"{item_indent}{quoted_k}:")
-                            for line in encoded_lines:
-                                lines.append(f"{item_indent}{line}")
-                        else:
-                            lines.append(f"{item_indent}{quoted_k}: {encoded_lines[0]}")
-                else:
-                    formatted_value = format_primitive_value(first_value, options.delimiter)
-                    lines.append(f"{indent}- {quoted_key}: {formatted_value}")
-
-                    for k in dict_keys[1:]:
-                        v = item[k]
-                        encoded_lines = encode_value(v, indent_level + 1, options)
-                        quoted_k = quote_if_needed_key(k)
-                        if isinstance(v, (dict, list)):
-                            lines.append(f"{item_indent}{quoted_k}:")
-                            for line in encoded_lines:
-                                lines.append(f"{item_indent}{line}")
-                        else:
-                            lines.append(f"{item_indent}{quoted_k}: {encoded_lines[0]}")
-        elif isinstance(item, list):
-            if not item:
-                length_prefix = "#0" if options.length_marker else "0"
-                if options.delimiter == "\t":
-                    delimiter_marker = "\t"
-                elif options.delimiter == "|":
-                    delimiter_marker = "|"
-                else:
-                    delimiter_marker = ""
-                lines.append(f"{indent}- [{length_prefix}{delimiter_marker}]:")
-            elif all(not isinstance(v, (dict, list)) for v in item):
-                array_line = format_primitive_array(item, options.delimiter, options.length_marker, indent_level + 1)
-                lines.append(f"{indent}- {array_line}")
-            else:
-                length_prefix = f"#{len(item)}" if options.length_marker else str(len(item))
-                if options.delimiter == "\t":
-                    delimiter_marker = "\t"
-                elif options.delimiter == "|":
-                    delimiter_marker = "|"
-                else:
-                    delimiter_marker = ""
-                lines.append(f"{indent}- [{length_prefix}{delimiter_marker}]:")
-                nested_lines = format_list_array(item, indent_level + 2, options)
-                lines.extend(nested_lines)
-        else:
-            formatted = format_primitive_value(item, options.delimiter)
-            lines.append(f"{indent}- {formatted}")
+        if type(item) is not plan.cls:
+            plan = get_plan(type(item))
+            if plan is None or plan.fields != fields:
+                return "mixed", None
+        for value in plan.values(item):
+            if type(value) not in PRIMITIVE_TYPES and is_nested(value):
+                return "mixed", None
+
+    return "tabular", fields
+
+
+def spool_array(items: Iterable, max_rows: int, sparse: float = 0.0, fold: int = 0, batch_size: int = 1024) -> tuple["SpooledArray", ArrayShape, tuple | None]:
+    from .spool import SpooledArray
+
+    spool = SpooledArray(max_rows)
+    shape: ArrayShape = "empty"
+    keys = None
+    dict_rows = False
+    columns: dict = {}
+    present = 0
+
+    items = iter(items)
+    try:
+        while batch := list(islice(items, batch_size)):
+            spool.extend(batch)
+            if shape == "mixed":
+                continue
+            batch_shape, batch_keys = classify_array(batch, 1.0 if sparse else 0.0, fold)
+            if shape == "empty":
+                shape, keys, dict_rows = batch_shape, batch_keys, isinstance(batch[0], dict)
+            elif batch_shape != shape:
+                shape = "mixed"
+            elif shape == "tabular":
+                if isinstance(batch[0], dict) != dict_rows:
+                    shape = "mixed"
+                elif not dict_rows:
+                    if batch_keys != keys:
+                        shape = "mixed"
+                elif (not sparse or is_folded(keys) or is_folded(batch_keys)) and set(batch_keys) != set(keys):
+                    shape = "mixed"
+            if sparse and shape == "tabular" and dict_rows and not is_folded(keys):
+                columns.update(dict.fromkeys(batch_keys))
+                present += sum(map(len, batch))
+    except BaseException:
+        spool.close()
+        raise
+
+    if sparse and shape == "tabular" and dict_rows and not is_folded(keys):
+        keys = tuple(columns)
+        cells = len(spool) * len(keys)
+        if cells - present > sparse * cells:
+            shape = "mixed"
+    return spool, shape, keys if shape == "tabular" else None
 
-    return lines
 
+def can_use_tabular(items: list) -> bool:
+    return classify_array(items)[0] == "tabular"
 
-def encode_array(items: list, indent_level: int, options: EncodeOptions) -> list[str]:
-    if not items:
-        length_prefix = "#0" if options.length_marker else "0"
-        if options.delimiter == "\t":
-            delimiter_marker = "\t"
-        elif options.delimiter == "|":
-            delimiter_marker = "|"
-        else:
-            delimiter_marker = ""
-        return [f"[{length_prefix}{delimiter_marker}]:"]
 
-    if all(not isinstance(item, (dict, list)) for item in items):
-        return [format_primitive_array(items, options.delimiter, options.length_marker, indent_level)]
+INTEGER_TYPECODES = frozenset("bBhHiIlLqQ")
 
-    if can_use_tabular(items):
-        return format_tabular_array("", items, options.delimiter, options.length_marker, indent_level - 1, options)
 
-    length_prefix = f"#{len(items)}" if options.length_marker else str(len(items))
-    if options.delimiter == "\t":
-        delimiter_marker = "\t"
-    elif options.delimiter == "|":
-        delimiter_marker = "|"
-    else:
-        delimiter_marker = ""
+def iter_chunks(lines: Iterable[str], chunk_size: int = 65536) -> Iterator[str]:
+    buffer = []
+    size = 0
+    separator = ""
 
-    lines = [f"[{length_prefix}{delimiter_marker}]:"]
-    lines.extend(format_list_array(items, indent_level + 1, options))
-    return lines
+    for line in lines:
+        buffer.append(line)
+        size += len(line) + 1
+        if size >= chunk_size:
+            yield separator + "\n".join(buffer)
+            buffer = []
+            size = 0
+            separator = "\n"
 
+    if buffer:
+        yield separator + "\n".join(buffer)
 
-def encode_object(obj: dict, indent_level: int, options: EncodeOptions) -> list[str]:
-    lines = []
-    indent = " " * (options.indent * indent_level)
 
-    for key, value in obj.items():
-        quoted_key = quote_if_needed_key(key)
+def iter_slices(items: Iterable, size: int) -> Iterator[list]:
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
 
-        if isinstance(value, dict):
-            if not value:
-                lines.append(f"{indent}{quoted_key}:")
+
+def make_executor(workers: int | None) -> "Executor":
+    if not getattr(sys, "_is_gil_enabled", lambda: True)():
+        from concurrent.futures import ThreadPoolExecutor
+
+        return ThreadPoolExecutor(max_workers=workers)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def format_chunk(options: EncodeOptions, items: list, keys: tuple | None, indent_level: int) -> str:
+    encoder = Encoder(options)
+    if keys is None:
+        return "\n".join(encoder.format_list_array(items, indent_level))
+    return "\n".join(encoder.format_tabular_rows(items, keys, indent_level))
+
+
+class Encoder:
+    def __init__(self, options: EncodeOptions | None = None):
+        if options is None:
+            options = EncodeOptions()
+
+        self.options = options
+        self.delimiter = options.delimiter
+        self.delimiter_marker = options.delimiter if options.delimiter in ("\t", "|") else ""
+        self.length_marker = "#" if options.length_marker else ""
+        self.empty_header = self.array_header(0) + ":"
+        self._indents = [" " * (options.indent * level) for level in range(16)]
+        self.parallel_rows = options.chunk_rows if options.parallel else 0
+        if options.sparse_tabular or options.fold_depth:
+            self.classify_array = partial(classify_array, sparse=options.sparse_tabular, fold=options.fold_depth)
+        else:
+            self.classify_array = classify_array
+        self.fill_marker = options.fill_marker
+        if not is_fill_marker(options.fill_marker, options.delimiter):
+            raise ValueError(f"fill_marker {options.fill_marker!r} could be read back as a value")
+        self.memo_limit = options.memo_lines
+        self.memo: dict[tuple[int, int, int], tuple[Any, list[str]]] = {}
+        self.seen: set[tuple[int, int, int]] = set()
+        self.memo_size = 0
+        self.fragments = None
+        self.path: list[str | int] = []
+        if options.fragment_cache_lines > 0:
+            from .fragments import FragmentCache
+
+            self.fragments = FragmentCache(options.fragment_cache_lines)
+            self.encode_field = self.tracked_field
+            self.format_list_array = self.tracked_list_array
+
+        if options.quote_cache_size > 0:
+            self.quote_cache = QuoteCache(options.delimiter, options.quote_cache_size)
+            self.quote_key = self.quote_cache.quote_key
+            self.quote_value = self.quote_cache.quote_value
+        else:
+            self.quote_cache = None
+            self.quote_key = quote_if_needed_key
+            self.quote_value = partial(quote_if_needed_value, delimiter=options.delimiter)
+
+        self.profile = ACTIVE_PROFILE.get() or (EncodeProfile() if options.profile else None)
+        if self.profile is not None:
+            instrument(self, self.profile)
+
+    def shared(self, obj: Any, level: int, kind: int, lines: Iterator[str]) -> Iterable[str]:
+        if not self.memo_limit:
+            return lines
+
+        key = (id(obj), level, kind)
+        entry = self.memo.get(key)
+        if entry is not None and entry[0] is obj:
+            return entry[1]
+        if key not in self.seen:
+            if len(self.seen) < self.memo_limit:
+                self.seen.add(key)
+            return lines
+
+        cached = list(lines)
+        if self.memo_size + len(cached) <= self.memo_limit:
+            self.memo[key] = (obj, cached)
+            self.memo_size += len(cached)
+        return cached
+
+    def scan_array(self, value: Iterable) -> tuple[Sequence, ArrayShape, tuple | None]:
+        if not isinstance(value, Sequence):
+            if not isinstance(value, Sized):
+                return spool_array(value, self.options.spool_rows, self.options.sparse_tabular, self.options.fold_depth)
+            value = list(value)
+        return (value, *self.classify_array(value))
+
+    def reset_memo(self) -> None:
+        self.memo.clear()
+        self.seen.clear()
+        self.memo_size = 0
+
+    def indent(self, level: int) -> str:
+        indents = self._indents
+        while level >= len(indents):
+            indents.append(" " * (self.options.indent * len(indents)))
+        return indents[level]
+
+    def array_header(self, length: int) -> str:
+        return f"[{self.length_marker}{length}{self.delimiter_marker}]"
+
+    def format_value(self, value: Any) -> str:
+        if type(value) is str:
+            return self.quote_value(value)
+        formatter = FORMATTERS.get(type(value))
+        if formatter is None:
+            formatter = resolve_formatter(type(value))
+        return formatter(value, self.delimiter)
+
+    def format_primitive_array(self, items: list) -> str:
+        format_value = self.format_value
+        formatted_values = self.delimiter.join(format_value(item) for item in items)
+        return f"{self.array_header(len(items))}: {formatted_values}"
+
+    def tabular_header(self, key: str, keys: Iterable[str], length: int) -> str:
+        header_keys = self.delimiter.join(self.quote_key(k) for k in keys)
+        return f"{key}{self.array_header(length)}{{{header_keys}}}:"
+
+    def format_tabular_array(self, key: str, items: list, keys: tuple, indent_level: int) -> Iterator[str]:
+        yield self.tabular_header(key, keys, len(items))
+
+        if self.parallel_rows and len(items) > self.parallel_rows:
+            yield from self.format_parallel(items, keys, indent_level)
+        else:
+            yield from self.format_tabular_rows(items, keys, indent_level)
+
+    def format_tabular_rows(self, items: list, keys: tuple, indent_level: int) -> Iterator[str]:
+        if is_folded(keys):
+            yield from self.format_folded_rows(items, keys, indent_level)
+            return
+
+        delimiter = self.delimiter
+        indent = self.indent(indent_level + 1)
+        format_value = self.format_value
+        cls = plan = None
+        for item in items:
+            if isinstance(item, dict):
+                try:
+                    row_values = delimiter.join(format_value(item[k]) for k in keys)
+                except KeyError:
+                    fill = self.fill_marker
+                    row_values = delimiter.join(format_value(item[k]) if k in item else fill for k in keys)
             else:
-                lines.append(f"{indent}{quoted_key}:")
-                nested_lines = encode_object(value, indent_level + 1, options)
-                lines.extend(nested_lines)
-        elif isinstance(value, list):
-            if not value:
-                length_prefix = "#0" if options.length_marker else "0"
-                if options.delimiter == "\t":
-                    delimiter_marker = "\t"
-                elif options.delimiter == "|":
-                    delimiter_marker = "|"
-                else:
-                    delimiter_marker = ""
-                lines.append(f"{indent}{quoted_key}[{length_prefix}{delimiter_marker}]:")
-            elif all(not isinstance(item, (dict, list)) for item in value):
-                array_line = format_primitive_array(value, options.delimiter, options.length_marker, indent_level)
-                lines.append(f"{indent}{quoted_key}{array_line}")
-            elif can_use_tabular(value):
-                tabular_lines = format_tabular_array(quoted_key, value, options.delimiter, options.length_marker, indent_level, options)
-                for i, line in enumerate(tabular_lines):
-                    if i == 0:
-                        lines.append(f"{indent}{line}")
-                    else:
-                        lines.append(f"{indent}{line}")
+                if type(item) is not cls:
+                    cls = type(item)
+                    plan = get_plan(cls)
+                if plan is None:
+                    yield from self.format_tabular_rows([item.value], keys, indent_level)
+                    continue
+                row_values = delimiter.join(map(format_value, plan.values(item)))
+            yield f"{indent}{row_values}"
+
+    def format_folded_rows(self, items: list, keys: tuple, indent_level: int) -> Iterator[str]:
+        delimiter = self.delimiter
+        indent = self.indent(indent_level + 1)
+        format_value = self.format_value
+        getters = [path_getter(key.path) if type(key) is FoldedKey else itemgetter(key) for key in keys]
+        for item in items:
+            if type(item) is Versioned:
+                item = item.value
+            row_values = delimiter.join(format_value(get(item)) for get in getters)
+            yield f"{indent}{row_values}"
+
+    def format_list_object(self, fields: Iterator[tuple[str, Any]], indent_level: int) -> Iterator[str]:
+        indent = self.indent(indent_level)
+        item_indent = self.indent(indent_level + 1)
+        quoted_key, first_value = next(fields)
+        value = first_value.value if type(first_value) is Versioned else first_value
+
+        if isinstance(value, list) or is_array_type(type(value)):
+            lines = self.format_first_array(indent, quoted_key, value, indent_level)
+            if self.fragments is None:
+                yield from lines
             else:
-                length_prefix = f"#{len(value)}" if options.length_marker else str(len(value))
-                if options.delimiter == "\t":
-                    delimiter_marker = "\t"
-                elif options.delimiter == "|":
-                    delimiter_marker = "|"
+                self.path.append(quoted_key)
+                if value is not first_value:
+                    lines = self.cached_lines((indent, indent_level, "version", first_value.version), lines)
+                yield from lines
+                self.path.pop()
+        else:
+            yield from self.encode_field(f"{indent}- ", quoted_key, first_value, indent_level + 1)
+
+        for k, v in fields:
+            yield from self.encode_field(item_indent, k, v, indent_level + 1)
+
+    def format_first_array(self, indent: str, quoted_key: str, value: Iterable, indent_level: int) -> Iterator[str]:
+        if isinstance(value, list):
+            shape, keys = self.classify_array(value)
+        else:
+            value, shape, keys = self.scan_array(value)
+        if shape == "tabular":
+            tabular_lines = self.format_tabular_array(quoted_key, value, keys, indent_level)
+            yield f"{indent}- {next(tabular_lines)}"
+            yield from tabular_lines
+        else:
+            yield from self.encode_array_field(f"{indent}- ", quoted_key, value, shape, keys, indent_level + 1)
+
+    def format_parallel(self, items: list, keys: tuple | None, indent_level: int) -> Iterator[str]:
+        options = replace(self.options, parallel=False)
+        chunks = iter_slices(items, self.parallel_rows)
+
+        with make_executor(self.options.workers) as executor:
+            yield from executor.map(format_chunk, repeat(options), chunks, repeat(keys), repeat(indent_level))
+
+    def format_list_array(self, items: list, indent_level: int) -> Iterator[str]:
+        if self.parallel_rows and len(items) > self.parallel_rows:
+            yield from self.format_parallel(items, None, indent_level)
+            return
+
+        indent = self.indent(indent_level)
+
+        for item in items:
+            if isinstance(item, dict):
+                if not item:
+                    yield f"{indent}- "
                 else:
-                    delimiter_marker = ""
-                lines.append(f"{indent}{quoted_key}[{length_prefix}{delimiter_marker}]:")
-                list_lines = format_list_array(value, indent_level + 1, options)
-                lines.extend(list_lines)
+                    lines = self.format_list_object(zip(map(self.quote_key, item.keys()), item.values()), indent_level)
+                    yield from self.shared(item, indent_level, 1, lines)
+            elif isinstance(item, list):
+                yield from self.format_list_item_array(item, self.classify_array(item)[0], indent_level)
+            elif type(item) in PRIMITIVE_TYPES:
+                yield f"{indent}- {self.format_value(item)}"
+            elif (plan := get_plan(type(item))) is not None:
+                if not plan.fields:
+                    yield f"{indent}- "
+                else:
+                    lines = self.format_list_object(zip(plan.keys, plan.values(item)), indent_level)
+                    yield from self.shared(item, indent_level, 1, lines)
+            elif is_array_type(type(item)):
+                item, shape, _ = self.scan_array(item)
+                yield from self.format_list_item_array(item, shape, indent_level)
+            elif type(item) is Versioned:
+                yield from Encoder.format_list_array(self, [item.value], indent_level)
+            else:
+                yield f"{indent}- {self.format_value(item)}"
+
+    def tracked_list_array(self, items: list, indent_level: int) -> Iterator[str]:
+        for index, item in enumerate(items):
+            self.path.append(index)
+            yield from Encoder.format_list_array(self, [item], indent_level)
+            self.path.pop()
+
+    def format_list_item_array(self, items: Sequence, shape: ArrayShape, indent_level: int) -> Iterator[str]:
+        indent = self.indent(indent_level)
+        if shape == "empty":
+            yield f"{indent}- {self.empty_header}"
+        elif shape == "primitive":
+            yield f"{indent}- {self.format_primitive_array(items)}"
+        else:
+            yield f"{indent}- {self.array_header(len(items))}:"
+            yield from self.format_list_array(items, indent_level + 2)
+
+    def encode_array(self, items: list, indent_level: int, shape: ArrayShape | None = None, keys: tuple | None = None) -> Iterator[str]:
+        if shape is None:
+            shape, keys = self.classify_array(items)
+        if shape == "empty":
+            yield self.empty_header
+        elif shape == "primitive":
+            yield self.format_primitive_array(items)
+        elif shape == "tabular":
+            yield from self.format_tabular_array("", items, keys, indent_level - 1)
+        else:
+            yield f"{self.array_header(len(items))}:"
+            yield from self.format_list_array(items, indent_level + 1)
+
+    def encode_field(self, prefix: str, quoted_key: str, value: Any, indent_level: int) -> Iterator[str]:
+        if isinstance(value, dict):
+            yield f"{prefix}{quoted_key}:"
+            if value:
+                yield from self.shared(value, indent_level + 1, 0, self.encode_object(value, indent_level + 1))
+        elif isinstance(value, list):
+            shape, keys = self.classify_array(value)
+            yield from self.encode_array_field(prefix, quoted_key, value, shape, keys, indent_level)
+        elif type(value) in PRIMITIVE_TYPES:
+            yield f"{prefix}{quoted_key}: {self.format_value(value)}"
+        elif type(value) is Versioned:
+            yield from self.cached_field(prefix, quoted_key, value.value, indent_level, "version", value.version)
+        elif (plan := get_plan(type(value))) is not None:
+            yield f"{prefix}{quoted_key}:"
+            yield from self.shared(value, indent_level + 1, 0, self.encode_record(value, plan, indent_level + 1))
+        elif is_array_type(type(value)):
+            items, shape, keys = self.scan_array(value)
+            yield from self.encode_array_field(prefix, quoted_key, items, shape, keys, indent_level)
         else:
-            formatted = format_primitive_value(value, options.delimiter)
-            lines.append(f"{indent}{quoted_key}: {formatted}")
+            yield f"{prefix}{quoted_key}: {self.format_value(value)}"
+
+    def tracked_field(self, prefix: str, quoted_key: str, value: Any, indent_level: int) -> Iterator[str]:
+        self.path.append(quoted_key)
+        yield from Encoder.encode_field(self, prefix, quoted_key, value, indent_level)
+        self.path.pop()
+
+    def cached_field(self, prefix: str, quoted_key: str, value: Any, indent_level: int, kind: str, version: Hashable) -> Iterable[str]:
+        if self.fragments is None:
+            return self.encode_field(prefix, quoted_key, value, indent_level)
+
+        return self.cached_lines((prefix, indent_level, kind, version), Encoder.encode_field(self, prefix, quoted_key, value, indent_level))
 
-    return lines
+    def cached_lines(self, key: tuple, lines: Iterable[str]) -> Iterable[str]:
+        key = (tuple(self.path), *key)
+        cached = self.fragments.get(key)
+        if cached is None:
+            cached = self.fragments.put(key, list(lines))
+        return cached
 
+    def encode_fragments(self, obj: dict) -> Iterator[str]:
+        from .fragments import content_key
 
-def encode_value(value: Any, indent_level: int, options: EncodeOptions) -> list[str]:
-    if isinstance(value, dict):
-        return encode_object(value, indent_level, options)
-    elif isinstance(value, list):
-        return encode_array(value, indent_level, options)
-    else:
-        return [format_primitive_value(value, options.delimiter)]
+        quote_key = self.quote_key
 
+        for key, value in obj.items():
+            digest = content_key(value) if type(value) not in PRIMITIVE_TYPES and is_nested(value) else None
+            if digest is None:
+                yield from self.encode_field("", quote_key(key), value, 0)
+            else:
+                quoted_key = quote_key(key)
+                self.path.append(quoted_key)
+                yield from self.cached_field("", quoted_key, value, 0, "content", digest)
+                self.path.pop()
+
+    def encode_array_field(self, prefix: str, quoted_key: str, items: list, shape: ArrayShape, keys: tuple | None, indent_level: int) -> Iterator[str]:
+        if shape == "empty":
+            yield f"{prefix}{quoted_key}{self.empty_header}"
+        elif shape == "primitive":
+            yield f"{prefix}{quoted_key}{self.format_primitive_array(items)}"
+        elif shape == "tabular":
+            tabular_lines = self.format_tabular_array(quoted_key, items, keys, indent_level)
+            yield f"{prefix}{next(tabular_lines)}"
+            yield from tabular_lines
+        else:
+            yield f"{prefix}{quoted_key}{self.array_header(len(items))}:"
+            yield from self.format_list_array(items, indent_level + 1)
+
+    def encode_object(self, obj: dict, indent_level: int) -> Iterator[str]:
+        indent = self.indent(indent_level)
+        quote_key = self.quote_key
 
-def encode(value: Any, options: EncodeOptions | None = None) -> str:
-    if options is None:
-        options = EncodeOptions()
+        for key, value in obj.items():
+            yield from self.encode_field(indent, quote_key(key), value, indent_level)
 
-    if isinstance(value, dict):
-        if not value:
-            return ""
-        lines = encode_object(value, 0, options)
-    elif isinstance(value, list):
-        lines = encode_array(value, 0, options)
-    else:
-        lines = [format_primitive_value(value, options.delimiter)]
+    def encode_record(self, obj: Any, plan: RecordPlan, indent_level: int) -> Iterator[str]:
+        indent = self.indent(indent_level)
 
-    return "\n".join(lines)
+        for quoted_key, value in zip(plan.keys, plan.values(obj)):
+            yield from self.encode_field(indent, quoted_key, value, indent_level)
+
+    def iter_lines(self, value: Any) -> Iterator[str]:
+        self.reset_memo()
+        self.path.clear()
+        if type(value) is Versioned:
+            value = value.value
+        if isinstance(value, dict):
+            if self.fragments is not None:
+                return self.encode_fragments(value)
+            return self.encode_object(value, 0)
+        if isinstance(value, list):
+            return self.encode_array(value, 0)
+        plan = get_plan(type(value))
+        if plan is not None:
+            return self.encode_record(value, plan, 0)
+        if is_array_type(type(value)):
+            items, shape, keys = self.scan_array(value)
+            return self.encode_array(items, 0, shape, keys)
+        return iter([self.format_value(value)])
+
+    def iter_encode(self, value: Any, chunk_size: int = 65536) -> Iterator[str]:
+        return iter_chunks(self.iter_lines(value), chunk_size)
+
+    def encode_to(self, value: Any, fp: TextIO, chunk_size: int = 65536) -> None:
+        for chunk in self.iter_encode(value, chunk_size):
+            fp.write(chunk)
+
+    def encode(self, value: Any) -> str:
+        return "\n".join(self.iter_lines(value))
+
+    def encode_many(self, values: Iterable[Any]) -> list[str]:
+        encode = self.encode
+        return [encode(value) for value in values]
+
+    def format_column(self, column: Sequence) -> list[str] | None:
+        if isinstance(column, array):
+            if column.typecode in INTEGER_TYPECODES:
+                return list(map(str, column))
+            return list(map(self.format_value, column))
+
+        value_types = set(map(type, column))
+        if value_types == {int}:
+            return list(map(str, column))
+        if value_types == {str}:
+            return list(map(self.quote_value, column))
+        if any(is_nested_type(value_type) for value_type in value_types):
+            return None
+        return list(map(self.format_value, column))
+
+    def encode_columns(self, name: str | None, columns: Mapping[str, Sequence]) -> str:
+        if not columns:
+            raise ValueError("encode_columns requires at least one column")
+
+        keys = list(columns)
+        values = [column if isinstance(column, (Sequence, array)) else memoryview(column).tolist() for column in columns.values()]
+        length = len(values[0])
+        if any(len(column) != length for column in values):
+            raise ValueError("All columns must have the same length")
+
+        key = "" if name is None else self.quote_key(name)
+        if length == 0:
+            return f"{key}{self.empty_header}"
+
+        formatted = []
+        for column in values:
+            formatted_column = self.format_column(column)
+            if formatted_column is None:
+                rows = [dict(zip(keys, row)) for row in zip(*values)]
+                return self.encode(rows if name is None else {name: rows})
+            formatted.append(formatted_column)
+
+        indent = self.indent(0 if name is None else 1)
+        lines = [self.tabular_header(key, keys, length)]
+        lines.extend(map(indent.__add__, map(self.delimiter.join, zip(*formatted))))
+        return "\n".join(lines)
+
+
+def encode_columns(name: str | None, columns: Mapping[str, Sequence], options: EncodeOptions | None = None) -> str:
+    return Encoder(options).encode_columns(name, columns)
+
+
+def iter_encode(value: Any, options: EncodeOptions | None = None, chunk_size: int = 65536) -> Iterator[str]:
+    return Encoder(options).iter_encode(value, chunk_size)
+
+
+def encode_to(value: Any, fp: TextIO, options: EncodeOptions | None = None, chunk_size: int = 65536) -> None:
+    Encoder(options).encode_to(value, fp, chunk_size)
+
+
+def encode(
+    value: Any,
+    options: EncodeOptions | None = None,
+    max_chars: int | None = None,
+    max_tokens: int | None = None,
+    estimator: Callable[[str], int] | None = None,
+) -> str:
+    if max_chars is None and max_tokens is None:
+        return Encoder(options).encode(value)
+
+    from .budget import encode_with_budget
+
+    return encode_with_budget(value, options, max_chars, max_tokens, estimator).text
@@ -0,0 +1,104 @@
+import math
+import sys
+from datetime import datetime, date
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable
+
+from .fragments import Versioned
+from .quoting import quote_if_needed_value
+
+Formatter = Callable[[Any, str], str]
+
+
+def format_null(value: Any, delimiter: str) -> str:
+    return "null"
+
+
+def format_bool(value: bool, delimiter: str) -> str:
+    return "true" if value else "false"
+
+
+def format_int(value: int, delimiter: str) -> str:
+    return int.__repr__(value)
+
+
+def format_float(value: float, delimiter: str) -> str:
+    if not math.isfinite(value):
+        return "null"
+    if value.is_integer():
+        return int.__repr__(int(value))
+    return float.__repr__(value)
+
+
+def format_decimal(value: Decimal, delimiter: str) -> str:
+    return str(value)
+
+
+def format_isoformat(value: date, delimiter: str) -> str:
+    return quote_if_needed_value(value.isoformat(), delimiter)
+
+
+def converting_formatter(convert: Callable[[Any], Any]) -> Formatter:
+    def formatter(value: Any, delimiter: str) -> str:
+        return format_primitive_value(convert(value), delimiter)
+
+    return formatter
+
+
+REGISTERED_FORMATTERS: dict[type, Formatter] = {
+    type(None): format_null,
+    bool: format_bool,
+    int: format_int,
+    float: format_float,
+    str: quote_if_needed_value,
+    Decimal: format_decimal,
+    datetime: format_isoformat,
+    date: format_isoformat,
+    Enum: converting_formatter(lambda member: member.value),
+    Versioned: converting_formatter(lambda wrapped: wrapped.value),
+}
+FORMATTERS = dict(REGISTERED_FORMATTERS)
+
+
+def has_formatter(cls: type) -> bool:
+    return any(base in REGISTERED_FORMATTERS for base in cls.__mro__) or default_formatter(cls) is not None
+
+
+def default_formatter(cls: type) -> Formatter | None:
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and issubclass(cls, numpy.generic):
+        return converting_formatter(numpy.generic.item)
+    uuid = sys.modules.get("uuid")
+    if uuid is not None and issubclass(cls, uuid.UUID):
+        return converting_formatter(str)
+    return None
+
+
+def register_formatter(cls: type, convert: Callable[[Any], Any]) -> None:
+    from .records import ARRAY_TYPES, PLANS
+
+    REGISTERED_FORMATTERS[cls] = converting_formatter(convert)
+    FORMATTERS.clear()
+    FORMATTERS.update(REGISTERED_FORMATTERS)
+    PLANS.clear()
+    ARRAY_TYPES.clear()
+
+
+def resolve_formatter(cls: type) -> Formatter:
+    for base in cls.__mro__:
+        formatter = REGISTERED_FORMATTERS.get(base)
+        if formatter is not None:
+            break
+    else:
+        formatter = default_formatter(cls) or format_null
+
+    FORMATTERS[cls] = formatter
+    return formatter
+
+
+def format_primitive_value(value: Any, delimiter: str) -> str:
+    formatter = FORMATTERS.get(type(value))
+    if formatter is None:
+        formatter = resolve_formatter(type(value))
+    return formatter(value, delimiter)
@@ -0,0 +1,66 @@
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class Versioned:
+    def __init__(self, value: Any, version: Hashable):
+        self.value = value
+        self.version = version
+
+    def __repr__(self) -> str:
+        return f"Versioned({self.value!r}, version={self.version!r})"
+
+
+def content_key(value: Any) -> bytes | None:
+    import pickle
+    from hashlib import blake2b
+
+    try:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+    return blake2b(data, digest_size=16).digest()
+
+
+class FragmentCache:
+    def __init__(self, max_lines: int = 1_000_000):
+        self.max_lines = max_lines
+        self.entries: OrderedDict[Hashable, list[str]] = OrderedDict()
+        self.lines = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> list[str] | None:
+        lines = self.entries.get(key)
+        if lines is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return lines
+
+    def put(self, key: Hashable, lines: list[str]) -> list[str]:
+        if len(lines) > self.max_lines:
+            return lines
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.lines -= len(old)
+        self.entries[key] = lines
+        self.lines += len(lines)
+        while self.lines > self.max_lines:
+            _, evicted = self.entries.popitem(last=False)
+            self.lines -= len(evicted)
+        return lines
+
+    def cache_info(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "max_lines": self.max_lines,
+            "lines": self.lines,
+            "entries": len(self.entries),
+        }
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.lines = 0
@@ -0,0 +1,193 @@
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator
+
+from .encoder import Encoder
+from .types import ArrayShape
+
+WHITESPACE = " \t\n\r"
+VALUE_END = frozenset(WHITESPACE + ",:]}")
+STRING_OR_SPACE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*(")?|[ \t\n\r]+')
+
+
+class JsonReader:
+    def __init__(self, data: bytes, chunk_size: int = 1 << 20):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.seek(0)
+
+    def seek(self, offset: int) -> None:
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.base = offset
+        self.end = offset
+        self.buf = ""
+        self.pos = 0
+
+    def tell(self) -> int:
+        return self.base + len(self.buf[:self.pos].encode("utf-8"))
+
+    def fill(self, size: int = 0) -> bool:
+        if self.end >= len(self.data):
+            return False
+        if self.pos >= self.chunk_size:
+            self.base = self.tell()
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self.data[self.end:self.end + max(size, self.chunk_size)]
+        self.end += len(chunk)
+        self.buf += self.text_decoder.decode(chunk, final=self.end >= len(self.data))
+        return True
+
+    def peek(self) -> str:
+        while True:
+            buf = self.buf
+            pos = self.pos
+            while pos < len(buf) and buf[pos] in WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}", self.buf, self.pos)
+        self.pos += 1
+
+    def read_value(self) -> Any:
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill(size):
+                    size *= 2
+                    continue
+                raise
+            if (end < len(self.buf) and self.buf[end] in VALUE_END) or not self.fill(size):
+                self.pos = end
+                return value
+            size *= 2
+
+    def iter_array(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.read_value()
+            if self.peek() == "]":
+                self.pos += 1
+                return
+            self.expect(",")
+
+    def iter_object(self) -> Iterator[str]:
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise json.JSONDecodeError("Expecting property name enclosed in double quotes", self.buf, self.pos)
+            key = self.read_value()
+            self.expect(":")
+            yield key
+            if self.peek() == "}":
+                self.pos += 1
+                return
+            self.expect(",")
+
+    def expect_end(self) -> None:
+        if self.peek():
+            raise json.JSONDecodeError("Extra data", self.buf, self.pos)
+
+
+class ReplayArray:
+    def __init__(self, reader: JsonReader, offset: int, length: int):
+        self.reader = reader
+        self.offset = offset
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[Any]:
+        resume = self.reader.tell()
+        self.reader.seek(self.offset)
+        yield from self.reader.iter_array()
+        self.reader.seek(resume)
+
+
+def scan_array(reader: JsonReader) -> tuple[ReplayArray, ArrayShape, tuple | None]:
+    offset = reader.tell()
+    length = 0
+    shape: ArrayShape = "empty"
+    first_keys = None
+
+    for item in reader.iter_array():
+        length += 1
+        if length == 1:
+            if isinstance(item, dict):
+                shape = "tabular" if item else "mixed"
+                first_keys = item.keys()
+            else:
+                shape = "mixed" if isinstance(item, list) else "primitive"
+        if shape == "primitive":
+            if isinstance(item, (dict, list)):
+                shape = "mixed"
+        elif shape == "tabular":
+            if not isinstance(item, dict) or item.keys() != first_keys:
+                shape = "mixed"
+            elif any(isinstance(value, (dict, list)) for value in item.values()):
+                shape = "mixed"
+
+    keys = tuple(first_keys) if shape == "tabular" else None
+    return ReplayArray(reader, offset, length), shape, keys
+
+
+def iter_json_lines(reader: JsonReader, encoder: Encoder) -> Iterator[str]:
+    first = reader.peek()
+
+    if first == "[":
+        items, shape, keys = scan_array(reader)
+        reader.expect_end()
+        yield from encoder.encode_array(items, 0, shape, keys)
+    elif first == "{":
+        for key in reader.iter_object():
+            if reader.peek() == "[":
+                items, shape, keys = scan_array(reader)
+                yield from encoder.encode_array_field("", encoder.quote_key(key), items, shape, keys, 0)
+            else:
+                yield from encoder.encode_field("", encoder.quote_key(key), reader.read_value(), 0)
+        reader.expect_end()
+    else:
+        value = reader.read_value()
+        reader.expect_end()
+        yield from encoder.iter_lines(value)
+
+
+def iter_compact(texts: Iterable[str]) -> Iterator[str]:
+    carry = ""
+    for text in texts:
+        text = carry + text
+        carry = ""
+        parts = []
+        pos = 0
+        for match in STRING_OR_SPACE.finditer(text):
+            parts.append(text[pos:match.start()])
+            pos = match.end()
+            if text[match.start()] == '"':
+                if match.group(1) is None:
+                    carry = text[match.start():]
+                    pos = len(text)
+                    break
+                parts.append(match.group())
+        parts.append(text[pos:])
+        yield "".join(parts)
+    if carry:
+        yield carry
@@ -0,0 +1,93 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Any, Iterator
+
+from .types import EncodeProfile
+
+if TYPE_CHECKING:
+    from .encoder import Encoder
+
+ACTIVE_PROFILE: ContextVar[EncodeProfile | None] = ContextVar("toon_profile", default=None)
+
+SHAPE_COUNTERS = {
+    "empty": "arrays_empty",
+    "primitive": "arrays_primitive",
+    "tabular": "arrays_tabular",
+    "mixed": "arrays_list",
+}
+
+
+@contextmanager
+def profile() -> Iterator[EncodeProfile]:
+    current = EncodeProfile()
+    token = ACTIVE_PROFILE.set(current)
+    try:
+        yield current
+    finally:
+        ACTIVE_PROFILE.reset(token)
+
+
+def instrument(encoder: "Encoder", stats: EncodeProfile) -> None:
+    quote_value = encoder.quote_value
+    quote_key = encoder.quote_key
+    format_value = encoder.format_value
+    classify_array = encoder.classify_array
+    iter_lines = encoder.iter_lines
+
+    def timed_quote_value(value: str) -> str:
+        start = perf_counter_ns()
+        result = quote_value(value)
+        stats.quote_ns += perf_counter_ns() - start
+        if result[:1] == '"':
+            stats.strings_quoted += 1
+        else:
+            stats.strings_plain += 1
+        return result
+
+    def timed_quote_key(key: str) -> str:
+        start = perf_counter_ns()
+        result = quote_key(key)
+        stats.quote_ns += perf_counter_ns() - start
+        if result[:1] == '"':
+            stats.keys_quoted += 1
+        else:
+            stats.keys_plain += 1
+        return result
+
+    def timed_format_value(value: Any) -> str:
+        stats.cells += 1
+        if type(value) is str:
+            return timed_quote_value(value)
+        start = perf_counter_ns()
+        result = format_value(value)
+        stats.format_ns += perf_counter_ns() - start
+        return result
+
+    def timed_classify_array(items: list) -> tuple:
+        start = perf_counter_ns()
+        result = classify_array(items)
+        stats.classify_ns += perf_counter_ns() - start
+        counter = SHAPE_COUNTERS[result[0]]
+        setattr(stats, counter, getattr(stats, counter) + 1)
+        return result
+
+    def timed_iter_lines(value: Any) -> Iterator[str]:
+        stats.encodes += 1
+        lines = iter_lines(value)
+        separator = 0
+        start = perf_counter_ns()
+        for line in lines:
+            stats.total_ns += perf_counter_ns() - start
+            stats.lines += 1
+            stats.chars += len(line) + separator
+            separator = 1
+            yield line
+            start = perf_counter_ns()
+        stats.total_ns += perf_counter_ns() - start
+
+    encoder.quote_value = timed_quote_value
+    encoder.quote_key = timed_quote_key
+    encoder.format_value = timed_format_value
+    encoder.classify_array = timed_classify_array
+    encoder.iter_lines = timed_iter_lines
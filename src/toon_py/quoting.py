@@ -1,4 +1,20 @@
 import re
+from functools import lru_cache, partial
+
+UNSAFE_KEY_CHARS = re.compile(r'[ ,:"{}\[\]\x00-\x1f]')
+STRUCTURAL_VALUE = re.compile(r'(?:true|false|null|-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)\Z|- |\[\d+\]|\{.+\}')
+STRUCTURAL_VALUE_START = frozenset("-tfn[{")
+LITERAL_VALUE = re.compile(r'(?:true|false|null|-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)\Z')
+
+ESCAPE_TABLE = {code: f"\\u{code:04x}" for code in range(32)}
+ESCAPE_TABLE.update({ord('"'): '\\"', ord("\\"): "\\\\", ord("\n"): "\\n", ord("\r"): "\\r", ord("\t"): "\\t"})
+
+
+def compile_unsafe_value_chars(delimiter: str) -> re.Pattern:
+    return re.compile(rf'[{re.escape(delimiter)}:"\\\x00-\x1f]')
+
+
+UNSAFE_VALUE_CHARS = {delimiter: compile_unsafe_value_chars(delimiter) for delimiter in (",", "\t", "|")}
 
 
 def needs_quoting_key(key: str) -> bool:
@@ -8,61 +24,47 @@ def needs_quoting_key(key: str) -> bool:
     if key.isdigit():
         return True
 
-    if key.startswith("-"):
-        return True
-
-    if any(char in key for char in [" ", ",", ":", '"', "{", "}", "[", "]"]) or any(ord(c) < 32 for c in key):
+    if key[0] == "-":
         return True
 
-    return False
+    return UNSAFE_KEY_CHARS.search(key) is not None
 
 
 def needs_quoting_value(value: str, delimiter: str) -> bool:
     if not value:
         return True
 
-    if value.startswith(" ") or value.endswith(" "):
+    if value[0] == " " or value[-1] == " ":
         return True
 
-    if any(char in value for char in [delimiter, ":", '"', "\\"]) or any(ord(c) < 32 for c in value):
+    pattern = UNSAFE_VALUE_CHARS.get(delimiter)
+    if pattern is None:
+        pattern = UNSAFE_VALUE_CHARS.setdefault(delimiter, compile_unsafe_value_chars(delimiter))
+    if pattern.search(value) is not None:
         return True
 
-    if value.startswith("- "):
-        return True
+    first = value[0]
+    if first in STRUCTURAL_VALUE_START or first.isdigit():
+        if STRUCTURAL_VALUE.match(value) is not None:
+            return True
+        if first == "0" and len(value) > 1 and value[1].isdigit():
+            return True
 
-    if value in ["true", "false", "null"]:
-        return True
+    return False
 
-    if re.match(r'^-?\d+(\.\d+)?([eE][+-]?\d+)?$', value):
-        return True
 
-    if value.startswith("0") and len(value) > 1 and value[1].isdigit():
+def is_fill_marker(marker: str, delimiter: str) -> bool:
+    if not marker:
         return True
 
-    if re.match(r'^\[\d+\]', value) or re.match(r'^\{.+\}', value) or re.match(r'^\[\d+\]:.*', value):
-        return True
+    if marker.strip() != marker or '"' in marker or delimiter in marker:
+        return False
 
-    return False
+    return LITERAL_VALUE.match(marker) is None and needs_quoting_value(marker, delimiter)
 
 
 def escape_string(s: str) -> str:
-    result = []
-    for char in s:
-        if char == '"':
-            result.append('\\"')
-        elif char == "\\":
-            result.append("\\\\")
-        elif char == "\n":
-            result.append("\\n")
-        elif char == "\r":
-            result.append("\\r")
-        elif char == "\t":
-            result.append("\\t")
-        elif ord(char) < 32:
-            result.append(f"\\u{ord(char):04x}")
-        else:
-            result.append(char)
-    return "".join(result)
+    return s.translate(ESCAPE_TABLE)
 
 
 def quote_if_needed_key(key: str) -> str:
@@ -75,3 +77,26 @@ def quote_if_needed_value(value: str, delimiter: str) -> str:
     if needs_quoting_value(value, delimiter):
         return f'"{escape_string(value)}"'
     return value
+
+
+class QuoteCache:
+    def __init__(self, delimiter: str = ",", maxsize: int = 1024):
+        self.delimiter = delimiter
+        self.maxsize = maxsize
+        self.quote_key = lru_cache(maxsize=maxsize)(quote_if_needed_key)
+        self.quote_value = lru_cache(maxsize=maxsize)(partial(quote_if_needed_value, delimiter=delimiter))
+
+    def cache_info(self) -> dict[str, int]:
+        key_info = self.quote_key.cache_info()
+        value_info = self.quote_value.cache_info()
+        return {
+            "hits": key_info.hits + value_info.hits,
+            "misses": key_info.misses + value_info.misses,
+            "maxsize": self.maxsize,
+            "keys": key_info.currsize,
+            "values": value_info.currsize,
+        }
+
+    def clear(self) -> None:
+        self.quote_key.cache_clear()
+        self.quote_value.cache_clear()
@@ -0,0 +1,110 @@
+import dataclasses
+import sys
+from collections.abc import Iterable, Mapping
+from functools import partial
+from operator import attrgetter
+from typing import Any
+
+from .formatters import has_formatter
+from .fragments import Versioned
+from .quoting import quote_if_needed_key
+
+PRIMITIVE_TYPES = frozenset({str, int, float, bool, type(None)})
+STDLIB_MODULES = frozenset(sys.stdlib_module_names)
+
+
+class RecordPlan:
+    def __init__(self, cls: type, fields: tuple[str, ...]):
+        self.cls = cls
+        self.fields = fields
+        self.keys = tuple(quote_if_needed_key(field) for field in fields)
+
+        if issubclass(cls, tuple):
+            self.values = iter
+        elif not dataclasses.is_dataclass(cls):
+            self.values = partial(slot_values, attrgetter(*fields, fields[0]), fields)
+        elif len(fields) > 1:
+            self.values = attrgetter(*fields)
+        else:
+            getters = tuple(map(attrgetter, fields))
+            self.values = lambda obj: tuple(getter(obj) for getter in getters)
+
+
+def slot_values(getter: attrgetter, fields: tuple[str, ...], obj: Any) -> tuple:
+    try:
+        return getter(obj)[:-1]
+    except AttributeError:
+        return tuple(getattr(obj, field, None) for field in fields)
+
+
+def is_stdlib_type(cls: type) -> bool:
+    return cls.__module__.partition(".")[0] in STDLIB_MODULES
+
+
+def slot_fields(cls: type) -> tuple[str, ...] | None:
+    if is_stdlib_type(cls):
+        return None
+
+    fields = []
+    for base in reversed(cls.__mro__[:-1]):
+        slots = base.__dict__.get("__slots__")
+        if slots is None or is_stdlib_type(base):
+            return None
+        if isinstance(slots, str):
+            slots = (slots,)
+        for name in slots:
+            if name in ("__dict__", "__weakref__"):
+                continue
+            if name.startswith("_"):
+                return None
+            fields.append(name)
+    return tuple(fields) or None
+
+
+def record_fields(cls: type) -> tuple[str, ...] | None:
+    if has_formatter(cls) or issubclass(cls, (dict, list)):
+        return None
+    if dataclasses.is_dataclass(cls):
+        return tuple(field.name for field in dataclasses.fields(cls))
+    if issubclass(cls, tuple):
+        fields = getattr(cls, "_fields", None)
+        return tuple(fields) if isinstance(fields, tuple) else None
+    return slot_fields(cls)
+
+
+PLANS: dict[type, RecordPlan | None] = {}
+
+
+def get_plan(cls: type) -> RecordPlan | None:
+    try:
+        return PLANS[cls]
+    except KeyError:
+        fields = record_fields(cls)
+        plan = PLANS[cls] = None if fields is None else RecordPlan(cls, fields)
+        return plan
+
+
+ARRAY_TYPES: dict[type, bool] = {}
+
+
+def is_array_type(cls: type) -> bool:
+    try:
+        return ARRAY_TYPES[cls]
+    except KeyError:
+        result = ARRAY_TYPES[cls] = (
+            issubclass(cls, Iterable)
+            and not issubclass(cls, (str, bytes, bytearray, Mapping))
+            and not has_formatter(cls)
+            and get_plan(cls) is None
+        )
+        return result
+
+
+def is_nested_type(cls: type) -> bool:
+    return issubclass(cls, (dict, list, Versioned)) or get_plan(cls) is not None or is_array_type(cls)
+
+
+def is_nested(value: Any) -> bool:
+    if isinstance(value, (dict, list)) or get_plan(type(value)) is not None or is_array_type(type(value)):
+        return True
+    return type(value) is Versioned and is_nested(value.value)
@@ -0,0 +1,61 @@
+import pickle
+import tempfile
+from typing import IO, Any, Iterator
+
+
+class SpooledArray:
+    def __init__(self, max_rows: int = 100_000):
+        self.max_rows = max_rows
+        self.head: list = []
+        self.tail: list = []
+        self.file: IO[bytes] | None = None
+        self.spill = True
+        self.spilled = False
+        self.replays = 1
+        self.length = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def extend(self, batch: list) -> None:
+        self.length += len(batch)
+        if self.file is None and len(self.head) + len(batch) <= self.max_rows:
+            self.head.extend(batch)
+            return
+
+        if self.spill:
+            if self.file is None:
+                if self.spilled:
+                    raise ValueError("SpooledArray is closed")
+                self.file = tempfile.TemporaryFile()
+                self.spilled = True
+            start = self.file.tell()
+            try:
+                pickle.dump(batch, self.file, protocol=pickle.HIGHEST_PROTOCOL)
+                return
+            except (pickle.PicklingError, TypeError, AttributeError):
+                self.file.seek(start)
+                self.file.truncate()
+                self.spill = False
+        self.tail.extend(batch)
+
+    def __iter__(self) -> Iterator[Any]:
+        if self.spilled and self.file is None:
+            raise ValueError("SpooledArray has already been replayed")
+        try:
+            yield from self.head
+            if self.file is not None:
+                end = self.file.tell()
+                self.file.seek(0)
+                while self.file.tell() < end:
+                    yield from pickle.load(self.file)
+            yield from self.tail
+        finally:
+            self.replays -= 1
+            if self.replays <= 0:
+                self.close()
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,134 @@
+import base64
+import json
+import re
+from collections.abc import Sequence, Sized
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator
+
+from .encoder import Encoder
+from .fragments import Versioned
+from .records import get_plan, is_array_type
+from .types import ArrayShape, EncodeOptions, EncodeStats
+
+PRETOKENIZE = re.compile(r"'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+(?!\S)|\s+")
+LONG_WORD = re.compile(r"[^\W\d_]{7,}")
+PUNCTUATION_RUN = re.compile(r"[^\s\w]{3,}")
+
+
+def estimate_tokens(text: str) -> int:
+    tokens = len(PRETOKENIZE.findall(text))
+    tokens += sum((len(word) - 1) // 6 for word in LONG_WORD.findall(text))
+    tokens += sum((len(run) - 1) // 2 for run in PUNCTUATION_RUN.findall(text))
+    return tokens
+
+
+class BpeEstimator:
+    def __init__(self, path: str, cache_size: int = 65536):
+        with open(path, "rb") as fp:
+            self.vocab = frozenset(base64.b64decode(line.split()[0]) for line in fp if line.strip())
+        self.max_length = max(map(len, self.vocab), default=1)
+        self.count_piece = lru_cache(maxsize=cache_size)(self.count_piece)
+
+    def count_piece(self, piece: str) -> int:
+        data = piece.encode("utf-8")
+        vocab = self.vocab
+        tokens = 0
+        pos = 0
+        while pos < len(data):
+            for size in range(min(self.max_length, len(data) - pos), 1, -1):
+                if data[pos:pos + size] in vocab:
+                    break
+            else:
+                size = 1
+            pos += size
+            tokens += 1
+        return tokens
+
+    def __call__(self, text: str) -> int:
+        return sum(map(self.count_piece, PRETOKENIZE.findall(text)))
+
+
+def json_default(value: Any) -> Any:
+    plan = get_plan(type(value))
+    if plan is not None:
+        return dict(zip(plan.fields, plan.values(value)))
+    if type(value) is Versioned:
+        return value.value
+    if isinstance(value, Iterator):
+        raise TypeError(f"Cannot measure one-shot iterator {type(value).__name__!r}; pass a list instead")
+    if is_array_type(type(value)):
+        return list(value)
+    return str(value)
+
+
+def iter_json(value: Any, chunk_size: int = 65536, default: Callable[[Any], Any] = json_default) -> Iterator[str]:
+    buffer = []
+    size = 0
+    for chunk in json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=default).iterencode(value):
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+class TokenCounter:
+    def __init__(self, estimator: Callable[[str], int] | None = None):
+        self.estimator = estimator or estimate_tokens
+        self.chars = 0
+        self.tokens = 0
+
+    def feed(self, chunk: str) -> str:
+        self.chars += len(chunk)
+        self.tokens += self.estimator(chunk)
+        return chunk
+
+    def count(self, chunks: Iterable[str]) -> Iterator[str]:
+        return map(self.feed, chunks)
+
+
+def count_tokens(chunks: Iterable[str], estimator: Callable[[str], int] | None = None) -> tuple[int, int]:
+    counter = TokenCounter(estimator)
+    for chunk in chunks:
+        counter.feed(chunk)
+    return counter.chars, counter.tokens
+
+
+class ReplayEncoder(Encoder):
+    def __init__(self, options: EncodeOptions | None = None):
+        super().__init__(options)
+        self.replays: dict[int, tuple[Any, Sequence]] = {}
+
+    def scan_array(self, value: Iterable) -> tuple[Sequence, ArrayShape, tuple | None]:
+        items, shape, keys = super().scan_array(value)
+        if not isinstance(value, Sized):
+            items.replays += 1
+            self.replays[id(value)] = (value, items)
+        return items, shape, keys
+
+    def json_default(self, value: Any) -> Any:
+        replay = self.replays.get(id(value))
+        if replay is not None and replay[0] is value:
+            return list(replay[1])
+        if isinstance(value, Iterator):
+            return list(value)
+        return json_default(value)
+
+
+def measure(
+    toon_chunks: Iterable[str],
+    value: Any,
+    estimator: Callable[[str], int] | None = None,
+    default: Callable[[Any], Any] = json_default,
+) -> EncodeStats:
+    chars, tokens = count_tokens(toon_chunks, estimator)
+    json_chars, json_tokens = count_tokens(iter_json(value, default=default), estimator)
+    return EncodeStats(chars=chars, tokens=tokens, json_chars=json_chars, json_tokens=json_tokens)
+
+
+def stats(value: Any, options: EncodeOptions | None = None, estimator: Callable[[str], int] | None = None) -> EncodeStats:
+    encoder = ReplayEncoder(options)
+    return measure(encoder.iter_encode(value), value, estimator, encoder.json_default)
@@ -1,9 +1,81 @@
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
 from typing import Literal
 
+ArrayShape = Literal["empty", "primitive", "tabular", "mixed"]
+
+
+class FoldedKey(str):
+    path: tuple[str, ...]
+
+    def __new__(cls, path: tuple[str, ...]):
+        key = super().__new__(cls, ".".join(path))
+        key.path = path
+        return key
+
+    def __getnewargs__(self) -> tuple[tuple[str, ...]]:
+        return (self.path,)
+
 
 @dataclass
 class EncodeOptions:
     indent: int = 2
     delimiter: Literal[",", "\t", "|"] = ","
     length_marker: Literal["#", False] = False
+    quote_cache_size: int = 0
+    parallel: bool = False
+    workers: int | None = None
+    chunk_rows: int = 50_000
+    profile: bool = False
+    memo_lines: int = 0
+    fragment_cache_lines: int = 0
+    spool_rows: int = 100_000
+    sparse_tabular: float = 0.0
+    fill_marker: str = ""
+    fold_depth: int = 0
+
+
+@dataclass
+class BudgetReport:
+    text: str
+    truncated: bool
+    chars: int
+    tokens: int | None
+    truncated_arrays: list[tuple[str, int, int]] = field(default_factory=list)
+    dropped_fields: list[str] = field(default_factory=list)
+
+
+@dataclass
+class EncodeStats:
+    chars: int
+    tokens: int
+    json_chars: int
+    json_tokens: int
+
+    @property
+    def token_savings(self) -> float:
+        return 1 - self.tokens / self.json_tokens if self.json_tokens else 0.0
+
+
+@dataclass
+class EncodeProfile:
+    encodes: int = 0
+    lines: int = 0
+    chars: int = 0
+    cells: int = 0
+    strings_quoted: int = 0
+    strings_plain: int = 0
+    keys_quoted: int = 0
+    keys_plain: int = 0
+    arrays_empty: int = 0
+    arrays_primitive: int = 0
+    arrays_tabular: int = 0
+    arrays_list: int = 0
+    total_ns: int = 0
+    classify_ns: int = 0
+    quote_ns: int = 0
+    format_ns: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        data = asdict(self)
+        data["assembly_ns"] = self.total_ns - self.classify_ns - self.quote_ns - self.format_ns
+        return data
@@ -0,0 +1,36 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from toon_py import aencode, aiter_encode, encode, EncodeOptions
+
+DATA = {"rows": [{"id": i, "name": f"user {i}", "score": i / 3} for i in range(5000)], "tags": ["a", "b"]}
+
+
+def test_aiter_encode_yields_to_event_loop():
+    async def main():
+        ticks = 0
+        done = False
+
+        async def ticker():
+            nonlocal ticks
+            while not done:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        chunks = [chunk async for chunk in aiter_encode(DATA, EncodeOptions(delimiter="|"), chunk_size=1024)]
+        done = True
+        await task
+        return chunks, ticks
+
+    chunks, ticks = asyncio.run(main())
+    assert "".join(chunks) == encode(DATA, EncodeOptions(delimiter="|"))
+    assert ticks >= len(chunks) > 10
+
+
+def test_aencode_cooperative_and_offloaded():
+    async def main():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return await asyncio.gather(aencode(DATA), aencode(DATA, offload=True), aencode(DATA, executor=executor))
+
+    assert asyncio.run(main()) == [encode(DATA)] * 3
@@ -1,5 +1,6 @@
 import pytest
 from toon_py import encode
+from toon_py.encoder import Encoder
 
 
 def test_small_product_catalog():
@@ -111,3 +112,35 @@ items[2]{sku,name,qty,price}:
 total: 109.97
 status: shipped"""
     assert result == expected
+
+
+def _deep_document(depth: int, width: int) -> dict:
+    node = {"rows": [{"id": i, "name": f"leaf{i}", "tags": ["x", "y"]} for i in range(width)]}
+    for level in range(depth):
+        node = {"items": [{"level": level, "child": node, "note": "n"}, level]}
+    return node
+
+
+class _CountingIndent(str):
+    formats = 0
+
+    def __format__(self, spec: str) -> str:
+        _CountingIndent.formats += 1
+        return str.__format__(self, spec)
+
+
+def test_deep_nesting_formats_each_line_once(monkeypatch):
+    indent = Encoder.indent
+    monkeypatch.setattr(Encoder, "indent", lambda self, level: _CountingIndent(indent(self, level)))
+
+    for depth, width in [(2, 100), (20, 70), (56, 10)]:
+        _CountingIndent.formats = 0
+        lines = encode(_deep_document(depth, width)).splitlines()
+        assert len(lines) == 311
+        assert _CountingIndent.formats == len(lines)
+
+
+def test_deep_nesting_indentation():
+    lines = encode(_deep_document(20, 1)).splitlines()
+    assert " " * 124 + "tags[2]: x,y" in lines
+    assert lines[-1] == "  - 19"
@@ -0,0 +1,46 @@
+from toon_py import decode, encode, encode_with_budget, EncodeOptions
+
+DATA = {
+    "title": "report",
+    "items": [{"sku": f"A{i}", "qty": i} for i in range(100)],
+    "tags": ["x"] * 50,
+    "tail": 1,
+}
+
+
+def test_budget_truncates_tabular_rows():
+    report = encode_with_budget(DATA, max_chars=60)
+    assert report.text == "title: report\nitems[3]{sku,qty}:\n  A0,0\n  A1,1\n  A2,2"
+    assert report.truncated
+    assert report.chars == len(report.text)
+    assert report.truncated_arrays == [("items", 3, 100)]
+    assert report.dropped_fields == ["tags", "tail"]
+
+
+def test_budget_output_is_valid_prefix():
+    full = encode(DATA)
+    for max_chars in range(0, len(full) + 10, 37):
+        text = encode(DATA, max_chars=max_chars)
+        assert len(text) <= max_chars
+        decoded = decode(text) if text else {}
+        assert list(decoded) == list(DATA)[:len(decoded)]
+        for key, value in decoded.items():
+            assert value == DATA[key][:len(value)] if isinstance(value, list) else value == DATA[key]
+
+
+def test_budget_not_reached():
+    report = encode_with_budget(DATA, EncodeOptions(delimiter="|"), max_chars=10_000)
+    assert report.text == encode(DATA, EncodeOptions(delimiter="|"))
+    assert not report.truncated
+    assert report.truncated_arrays == report.dropped_fields == []
+
+
+def test_budget_root_arrays_and_tokens():
+    rows = [{"id": i, "tags": ["a"]} for i in range(10)]
+    assert encode(rows, max_chars=60) == "[2]:\n  - id: 0\n    tags[1]: a\n  - id: 1\n    tags[1]: a"
+    assert encode(list(range(100)), max_chars=20) == "[7]: 0,1,2,3,4,5,6"
+    assert encode([{"a": 1}] * 5, max_chars=0) == ""
+
+    report = encode_with_budget(DATA, max_tokens=12, estimator=lambda text: len(text.split()))
+    assert report.tokens <= 12
+    assert report.text.startswith("title: report\nitems[")
@@ -0,0 +1,115 @@
+import json
+import subprocess
+import sys
+
+from toon_py import decode, encode, stats, EncodeOptions
+from toon_py import cli
+from toon_py.cli import iter_ndjson_records, main, parse_args
+
+
+def make_records(count: int) -> list[str]:
+    return [json.dumps({"id": i, "tags": ["a", f"t{i}"], "items": [{"x": i}, {"x": -i}]}) for i in range(count)]
+
+
+def test_ndjson_records_serial():
+    lines = make_records(5) + [""]
+    records = list(iter_ndjson_records(lines, EncodeOptions(), batch_size=2))
+    assert records == [encode(json.loads(line)) for line in lines if line]
+
+
+def test_ndjson_records_parallel_keeps_order():
+    lines = make_records(50)
+    records = list(iter_ndjson_records(lines, EncodeOptions(delimiter="|"), jobs=2, batch_size=7))
+    assert [decode(record) for record in records] == [json.loads(line) for line in lines]
+
+
+def test_ndjson_cli_separator(tmp_path, capsys):
+    source = tmp_path / "input.ndjson"
+    source.write_text("\n".join(make_records(3)) + "\n")
+    assert main([str(source), "--ndjson", "--record-separator", "\\n---\\n"]) == 0
+    records = capsys.readouterr().out.rstrip("\n").split("\n---\n")
+    assert records == [encode(json.loads(line)) for line in make_records(3)]
+
+
+def test_ndjson_cli_invalid_record(tmp_path, capsys):
+    source = tmp_path / "input.ndjson"
+    source.write_text('{"a": 1}\n{not json}\n')
+    assert main([str(source), "--ndjson"]) == 1
+    assert "Invalid JSON record" in capsys.readouterr().out
+
+
+def test_cli_json_string(capsys):
+    assert main(['{"tags": ["a", "b"]}', "-d", "pipe", "--length-marker"]) == 0
+    assert capsys.readouterr().out == "tags[#2|]: a|b\n"
+
+
+def test_cli_output_file(tmp_path, capsys):
+    output = tmp_path / "out.toon"
+    assert main(['{"id": 1}', "--output=" + str(output), "--indent", "4"]) == 0
+    assert output.read_text() == "id: 1"
+    assert f"TOON output written to {output}" in capsys.readouterr().out
+
+
+def test_cli_invalid_delimiter(capsys):
+    assert main(['{"id": 1}', "-d", "semicolon"]) == 1
+    assert "Invalid delimiter 'semicolon'" in capsys.readouterr().out
+
+
+def test_parse_args_falls_back_for_help_and_bad_values():
+    assert parse_args(["data.json", "-i", "4", "-l"]) == {"input_source": "data.json", "indent": 4, "length_marker": True}
+    assert parse_args(["--help"]) is None
+    assert parse_args(["-i", "four"]) is None
+    assert parse_args(["-o"]) is None
+    assert parse_args(["a.json", "b.json"]) is None
+
+
+def test_package_exports_are_listed():
+    import toon_py
+
+    assert sorted(toon_py.__all__) == sorted(toon_py.EXPORTS)
+
+
+def test_cli_startup_imports():
+    code = "import sys, toon_py.cli; print(' '.join(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    modules = set(result.stdout.split())
+    deferred = {"typer", "rich", "click", "concurrent.futures", "pickle", "hashlib", "uuid", "toon_py.decoder", "toon_py.spool"}
+    assert deferred.isdisjoint(modules)
+
+
+def test_cli_large_file_is_streamed(tmp_path, capsys, monkeypatch):
+    monkeypatch.setattr(cli, "MMAP_THRESHOLD", 0)
+    data = {"items": [{"sku": f"A{i}", "qty": i} for i in range(100)], "total": 100}
+    source = tmp_path / "input.json"
+    source.write_text(json.dumps(data))
+    output = tmp_path / "out.toon"
+
+    assert main([str(source)]) == 0
+    assert capsys.readouterr().out == encode(data) + "\n"
+    assert main([str(source), "-o", str(output)]) == 0
+    assert output.read_text() == encode(data)
+
+    source.write_text('{"items": [1, 2')
+    assert main([str(source)]) == 1
+    assert "Invalid JSON" in capsys.readouterr().out
+
+
+def test_cli_stats(tmp_path, capsys, monkeypatch):
+    data = {"users": [{"id": i, "name": f"user{i}"} for i in range(20)]}
+    source = tmp_path / "input.json"
+    source.write_text(json.dumps(data, indent=2))
+
+    assert main([str(source), "--stats"]) == 0
+    captured = capsys.readouterr()
+    assert captured.out == encode(data) + "\n"
+    toon_line, json_line, saved_line = captured.err.splitlines()
+    assert toon_line.startswith(f"TOON: {len(encode(data)):,} chars, ~")
+    assert json_line.startswith(f"JSON: {len(json.dumps(data, separators=(',', ':'))):,} chars, ~")
+    assert json_line.endswith(f"~{stats(data).json_tokens:,} tokens")
+    assert saved_line.startswith("Saved: ")
+
+    monkeypatch.setattr(cli, "MMAP_THRESHOLD", 0)
+    assert main([str(source), "--stats"]) == 0
+    assert capsys.readouterr().err == captured.err
+
+    assert main([str(source), "--stats", "--ndjson"]) == 1
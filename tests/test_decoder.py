@@ -0,0 +1,200 @@
+import io
+
+import pytest
+from toon_py import decode, decode_from, encode, iter_rows, EncodeOptions, ToonDecodeError
+
+
+def test_decode_simple_object():
+    assert decode("id: 1\nname: Ada\nactive: true") == {"id": 1, "name": "Ada", "active": True}
+
+
+def test_decode_nested_object():
+    assert decode("user:\n  id: 123\n  name: Ada") == {"user": {"id": 123, "name": "Ada"}}
+
+
+def test_decode_primitive_array():
+    assert decode("tags[3]: foo,bar,baz") == {"tags": ["foo", "bar", "baz"]}
+
+
+def test_decode_tabular_array():
+    text = "items[2]{sku,qty,price}:\n  A1,2,9.99\n  B2,1,14.5"
+    assert decode(text) == {
+        "items": [
+            {"sku": "A1", "qty": 2, "price": 9.99},
+            {"sku": "B2", "qty": 1, "price": 14.5},
+        ]
+    }
+
+
+def test_decode_mixed_array():
+    assert decode("items[3]:\n  - 1\n  - a: 1\n  - text") == {"items": [1, {"a": 1}, "text"]}
+
+
+def test_decode_empty_containers():
+    assert decode("") == {}
+    assert decode("\n\n") == {}
+    assert decode("items[0]:") == {"items": []}
+    assert decode("config:") == {"config": {}}
+    assert decode("[0]:") == []
+
+
+def test_decode_root_values():
+    assert decode("[3]: x,y,z") == ["x", "y", "z"]
+    assert decode("[2]{a,b}:\n1,2\n3,4") == [{"a": 1, "b": 2}, {"a": 3, "b": 4}]
+    assert decode("hello") == "hello"
+    assert decode("null") is None
+    assert decode('"a: b"') == "a: b"
+
+
+def test_decode_delimiters_and_length_marker():
+    assert decode("tags[#3\t]: a\tb\tc") == {"tags": ["a", "b", "c"]}
+    assert decode("rows[2|]{a|b}:\n  1|x,y\n  2|z") == {"rows": [{"a": 1, "b": "x,y"}, {"a": 2, "b": "z"}]}
+
+
+def test_decode_quoted_values_and_keys():
+    text = '"full name": "say \\"hi\\""\nvalues[4]: "42","a,b","line\\nbreak",-\n"123": "007"'
+    assert decode(text) == {
+        "full name": 'say "hi"',
+        "values": ["42", "a,b", "line\nbreak", "-"],
+        "123": "007",
+    }
+
+
+def test_decode_list_items_with_fields():
+    text = (
+        "items[2]:\n"
+        "  - users[2]{id,name}:\n"
+        "    1,Ada\n"
+        "    2,Bob\n"
+        "    status: active\n"
+        "  - config:\n"
+        "      debug: true\n"
+        "    tags[2]: a,b"
+    )
+    assert decode(text) == {
+        "items": [
+            {"users": [{"id": 1, "name": "Ada"}, {"id": 2, "name": "Bob"}], "status": "active"},
+            {"config": {"debug": True}, "tags": ["a", "b"]},
+        ]
+    }
+
+
+@pytest.mark.parametrize(
+    "options",
+    [EncodeOptions(), EncodeOptions(indent=4, delimiter="\t"), EncodeOptions(delimiter="|", length_marker="#")],
+)
+def test_decode_round_trip(options):
+    data = {
+        "order_id": "ORD-12345",
+        "customer": {"id": 789, "name": "Jane Doe", "email": "jane@example.com"},
+        "items": [
+            {"sku": "WIDGET-A", "name": "Premium, Widget", "qty": 2, "price": 29.99},
+            {"sku": "GADGET-B", "name": "Deluxe | Gadget", "qty": 1, "price": 49.99},
+        ],
+        "history": [
+            {"at": "2025-01-01T00:00:00Z", "events": [[1, 2], [], [{"x": None}, "y"]]},
+            {"note": "", "meta": {}},
+            [],
+            {},
+        ],
+        "total": 109.97,
+    }
+    assert decode(encode(data, options)) == data
+
+
+def test_decode_from_file():
+    data = {"items": [{"id": 1, "name": "Ada"}], "count": 1}
+    assert decode_from(io.StringIO(encode(data) + "\n")) == data
+
+
+def test_decode_row_count_mismatch():
+    with pytest.raises(ToonDecodeError) as exc_info:
+        decode("items[3]{a,b}:\n  1,2\n  3,4")
+    assert "Expected 3 rows" in str(exc_info.value)
+
+
+def test_decode_list_count_mismatch():
+    with pytest.raises(ToonDecodeError):
+        decode("items[2]:\n  - 1\nother: 2")
+
+
+def test_decode_inline_count_mismatch():
+    with pytest.raises(ToonDecodeError):
+        decode("tags[3]: a,b")
+
+
+def test_decode_unterminated_string_reports_line():
+    with pytest.raises(ToonDecodeError) as exc_info:
+        decode('items[2]{a,b}:\n  1,2\n  "x,3')
+    assert exc_info.value.lineno == 3
+
+
+def test_decode_invalid_escape_reports_line():
+    with pytest.raises(ToonDecodeError) as exc_info:
+        decode('a: 1\nb: "bad\\q"')
+    assert exc_info.value.lineno == 2
+    with pytest.raises(ToonDecodeError) as exc_info:
+        decode('items[2]{a,b}:\n  1,2\n  "\\q",3')
+    assert exc_info.value.lineno == 3
+    with pytest.raises(ToonDecodeError):
+        list(iter_rows(io.StringIO('items[1]{a}:\n  "\\q"')))
+
+
+def test_iter_rows_dicts():
+    data = {
+        "meta": {"count": 3},
+        "items": [{"id": i, "name": f"user {i}", "active": i % 2 == 0} for i in range(3)],
+        "total": 3,
+    }
+    rows = iter_rows(io.StringIO(encode(data)))
+    assert rows.keys == ("id", "name", "active")
+    assert rows.length == 3
+    assert list(rows) == data["items"]
+
+
+def test_iter_rows_nested_path_and_tuples():
+    data = {
+        "skipped": [{"items": [{"x": 1}], "note": "n"}, 1],
+        "report": {"items": [{"a": 1, "b": "x|y"}, {"a": 2, "b": "z"}]},
+    }
+    text = encode(data, EncodeOptions(delimiter="|", indent=4))
+    rows = iter_rows(io.StringIO(text), path="report.items", as_tuples=True)
+    assert list(rows) == [(1, "x|y"), (2, "z")]
+
+
+def test_iter_rows_root_array():
+    text = encode([{"a": 1, "b": 2}, {"a": 3, "b": 4}])
+    assert list(iter_rows(io.StringIO(text), path="", as_tuples=True)) == [(1, 2), (3, 4)]
+
+
+def test_iter_rows_is_lazy():
+    def lines():
+        yield "items[1000000]{id,name}:\n"
+        for i in range(1_000_000):
+            yield f"  {i},row{i}\n"
+
+    rows = iter(iter_rows(lines()))
+    assert next(rows) == {"id": 0, "name": "row0"}
+    assert next(rows) == {"id": 1, "name": "row1"}
+
+
+def test_iter_rows_missing_path():
+    with pytest.raises(ToonDecodeError):
+        iter_rows(io.StringIO("other[1]{a}:\n  1"))
+    with pytest.raises(ToonDecodeError):
+        iter_rows(io.StringIO("[x]"))
+
+
+def test_decode_fill_marker_cells_as_missing():
+    text = "items[3]{id,name,phone}:\n  1,Ada,555\n  2,Bob,\n  3,,\"\""
+    assert decode(text) == {"items": [{"id": 1, "name": "Ada", "phone": 555}, {"id": 2, "name": "Bob"}, {"id": 3, "phone": ""}]}
+    assert decode("items[1]{a,b}:\n  {-},1", fill_marker="{-}") == {"items": [{"b": 1}]}
+    assert list(iter_rows(io.StringIO(text), as_tuples=True))[1] == (2, "Bob", None)
+
+
+def test_decode_expand_paths():
+    text = 'items[2]{id,geo.lat,geo.lon,"a.b"}:\n  1,1.5,-2,x\n  2,0.5,3,y'
+    assert decode(text, expand_paths=True) == {
+        "items": [{"id": 1, "geo": {"lat": 1.5, "lon": -2}, "a.b": "x"}, {"id": 2, "geo": {"lat": 0.5, "lon": 3}, "a.b": "y"}]
+    }
+    assert decode(text)["items"][0] == {"id": 1, "geo.lat": 1.5, "geo.lon": -2, "a.b": "x"}
@@ -1,5 +1,11 @@
+import io
+from array import array
+from enum import Enum
+from uuid import UUID
+
 import pytest
-from toon_py import encode, EncodeOptions
+from toon_py import Encoder, encode, encode_columns, encode_to, iter_encode, register_formatter, EncodeOptions
+from toon_py.encoder import classify_array
 
 
 def test_simple_object():
@@ -166,3 +172,224 @@ def test_nested_array_in_object():
     result = encode(data)
     expected = "items[1]:\n  - users[2]{id,name}:\n    1,Ada\n    2,Bob\n    status: active"
     assert result == expected
+
+
+def test_iter_encode_chunks_match_encode():
+    data = {
+        "users": [{"id": i, "name": f"user{i}"} for i in range(200)],
+        "meta": {"total": 200, "tags": ["a", "b"]},
+    }
+    chunks = list(iter_encode(data, chunk_size=64))
+    assert len(chunks) > 1
+    assert "".join(chunks) == encode(data)
+
+
+def test_iter_encode_empty_object():
+    assert list(iter_encode({})) == []
+
+
+def test_encode_to_file():
+    data = {"items": [{"id": 1, "name": "Ada"}, {"id": 2, "name": "Bob"}], "count": 2}
+    buffer = io.StringIO()
+    encode_to(data, buffer, EncodeOptions(delimiter="|"), chunk_size=8)
+    assert buffer.getvalue() == encode(data, EncodeOptions(delimiter="|"))
+
+
+def test_list_item_nested_object_field():
+    data = {"items": [{"id": 1, "meta": {"a": 1, "b": {"c": 2}}}, 1]}
+    result = encode(data)
+    expected = "items[2]:\n  - id: 1\n    meta:\n      a: 1\n      b:\n        c: 2\n  - 1"
+    assert result == expected
+
+
+def test_list_item_array_fields():
+    data = {"items": [{"id": 1, "tags": ["a", "b"], "rows": [{"x": 1}, {"x": 2}]}, 1]}
+    result = encode(data)
+    expected = "items[2]:\n  - id: 1\n    tags[2]: a,b\n    rows[2]{x}:\n      1\n      2\n  - 1"
+    assert result == expected
+
+
+def test_list_item_first_field_object():
+    data = {"items": [{"config": {"debug": True}, "name": "a"}, 1]}
+    result = encode(data)
+    expected = "items[2]:\n  - config:\n      debug: true\n    name: a\n  - 1"
+    assert result == expected
+
+
+def test_nested_tabular_array_indent():
+    data = {"outer": {"rows": [{"id": 1}, {"id": 2}]}}
+    result = encode(data)
+    assert result == "outer:\n  rows[2]{id}:\n    1\n    2"
+
+
+def test_encoder_reuse():
+    encoder = Encoder(EncodeOptions(delimiter="|", length_marker="#"))
+    data = {"tags": ["a", "b"], "items": [{"id": 1}, {"id": 2}]}
+    assert encoder.encode(data) == "tags[#2|]: a|b\nitems[#2|]{id}:\n  1\n  2"
+    assert encoder.encode(data) == encode(data, EncodeOptions(delimiter="|", length_marker="#"))
+
+
+def test_encoder_encode_many():
+    encoder = Encoder()
+    docs = [{"id": 1}, [1, 2], {}, "text"]
+    assert encoder.encode_many(docs) == ["id: 1", "[2]: 1,2", "", "text"]
+
+
+def test_encoder_deep_indent():
+    data = {"a": {}}
+    node = data["a"]
+    for _ in range(40):
+        node["b"] = {}
+        node = node["b"]
+    node["leaf"] = 1
+    assert encode(data).splitlines()[-1] == " " * 82 + "leaf: 1"
+
+
+def test_classify_array_shapes():
+    assert classify_array([]) == ("empty", None)
+    assert classify_array([1, "a", None]) == ("primitive", None)
+    assert classify_array([{"a": 1, "b": 2}, {"b": 3, "a": 4}]) == ("tabular", ("a", "b"))
+    assert classify_array([{"a": 1}, {"a": 1, "b": 2}]) == ("mixed", None)
+    assert classify_array([{"a": 1}, {"b": 1}]) == ("mixed", None)
+    assert classify_array([{"a": [1]}]) == ("mixed", None)
+    assert classify_array([{}, {}]) == ("mixed", None)
+    assert classify_array([1, [2]]) == ("mixed", None)
+    assert classify_array([{"a": 1}, 2]) == ("mixed", None)
+
+
+def test_tabular_with_reordered_keys():
+    data = {"items": [{"a": 1, "b": 2}, {"b": 3, "a": 4}]}
+    assert encode(data) == "items[2]{a,b}:\n  1,2\n  4,3"
+
+
+def test_encode_columns_matches_rows():
+    columns = {
+        "id": array("q", [1, 2, 3]),
+        "name": ["Ada", "Bob, Jr.", "true"],
+        "score": array("d", [9.5, 10.0, float("nan")]),
+        "active": [True, False, None],
+    }
+    rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    expected = 'items[3]{id,name,score,active}:\n  1,Ada,9.5,true\n  2,"Bob, Jr.",10,false\n  3,"true",null,null'
+    assert encode_columns("items", columns) == expected
+    assert encode_columns("items", columns) == encode({"items": rows})
+
+
+def test_encode_columns_options_and_root():
+    columns = {"a": [1, 2], "b": ["x|y", "z"]}
+    options = EncodeOptions(delimiter="|", length_marker="#")
+    rows = [{"a": 1, "b": "x|y"}, {"a": 2, "b": "z"}]
+    assert encode_columns("rows", columns, options) == encode({"rows": rows}, options)
+    assert encode_columns(None, columns) == encode(rows)
+    assert encode_columns("rows", {"a": []}) == "rows[0]:"
+
+
+def test_encode_columns_nested_values_fall_back():
+    columns = {"id": [1, 2], "tags": [["a"], ["b", "c"]]}
+    rows = [{"id": 1, "tags": ["a"]}, {"id": 2, "tags": ["b", "c"]}]
+    assert encode_columns("items", columns) == encode({"items": rows})
+    assert encode_columns("t", {"a": [1, 2], "b": [(1, 2), (3,)]}) == "t[2]:\n  - a: 1\n    b[2]: 1,2\n  - a: 2\n    b[1]: 3"
+
+
+def test_encode_columns_length_mismatch():
+    with pytest.raises(ValueError):
+        encode_columns("items", {"a": [1, 2], "b": [1]})
+
+
+def test_special_floats():
+    data = {"nan": float("nan"), "inf": float("-inf"), "big": 1e20, "small": -2.5e-7}
+    assert encode(data) == "nan: null\ninf: null\nbig: 100000000000000000000\nsmall: -2.5e-07"
+
+
+def test_uuid_and_enum_values():
+    class Color(Enum):
+        RED = "red"
+        DARK = "dark, red"
+
+    data = {"id": UUID(int=1), "colors": [Color.RED, Color.DARK]}
+    assert encode(data) == 'id: "00000000-0000-0000-0000-000000000001"\ncolors[2]: red,"dark, red"'
+
+
+def test_register_formatter():
+    class Money:
+        def __init__(self, cents):
+            self.cents = cents
+
+    class Euro(Money):
+        pass
+
+    assert encode({"price": Money(150)}) == "price: null"
+    register_formatter(Money, lambda money: f"{money.cents / 100:.2f}")
+    assert encode({"prices": [Money(150), Euro(5)]}) == 'prices[2]: "1.50","0.05"'
+
+
+def test_parallel_matches_serial():
+    data = {
+        "rows": [{"id": i, "name": f"user {i}", "score": i / 4} for i in range(23)],
+        "events": [{"id": i, "tags": ["a", str(i)]} if i % 3 else [i, "x"] for i in range(17)],
+        "nested": {"items": [{"sku": f"A{i}", "qty": i} for i in range(9)]},
+    }
+    options = EncodeOptions(delimiter="|", parallel=True, workers=2, chunk_rows=4)
+    expected = encode(data, EncodeOptions(delimiter="|"))
+    assert encode(data, options) == expected
+    assert "".join(iter_encode(data, options, chunk_size=16)) == expected
+    assert encode(data["rows"], options) == encode(data["rows"], EncodeOptions(delimiter="|"))
+
+
+def test_memo_reuses_shared_subtrees():
+    author = {"name": "Ada", "org": {"city": "London", "tags": ["a", "b"]}}
+    data = {"posts": [{"id": i, "author": author, "extra": [author]} for i in range(3)], "owner": author}
+    options = EncodeOptions(memo_lines=64)
+    encoder = Encoder(options)
+    assert encoder.encode(data) == encode(data)
+    assert encoder.memo_size > 0
+    assert encode(data, options) == encode(data)
+
+
+def test_memo_respects_line_cap():
+    shared = {"a": 1, "b": {"c": 2}}
+    encoder = Encoder(EncodeOptions(memo_lines=2))
+    assert encoder.encode([shared, shared, shared]) == encode([shared, shared, shared])
+    assert encoder.memo_size <= 2
+
+
+def test_sparse_tabular_fills_missing_keys():
+    rows = [{"id": 1, "name": "Ada", "phone": "555-1"}, {"name": "Bob", "id": 2}, {"id": 3, "phone": "555-3"}]
+    assert encode({"users": rows}) == encode({"users": rows}, EncodeOptions(sparse_tabular=0.1))
+    assert encode({"users": rows}, EncodeOptions(sparse_tabular=0.25)) == (
+        "users[3]{id,name,phone}:\n  1,Ada,555-1\n  2,Bob,\n  3,,555-3"
+    )
+    assert encode(rows, EncodeOptions(sparse_tabular=0.5, fill_marker="{-}", delimiter="|")) == (
+        "[3|]{id|name|phone}:\n1|Ada|555-1\n2|Bob|{-}\n3|{-}|555-3"
+    )
+    assert encode([{"a": 1}, {"b": {"c": 1}}], EncodeOptions(sparse_tabular=1.0)) == "[2]:\n  - a: 1\n  - b:\n      c: 1"
+
+
+def test_sparse_tabular_rejects_ambiguous_fill_marker():
+    with pytest.raises(ValueError):
+        Encoder(EncodeOptions(sparse_tabular=0.1, fill_marker="-"))
+    with pytest.raises(ValueError):
+        Encoder(EncodeOptions(fill_marker="null"))
+
+
+def test_fold_depth_flattens_nested_objects_into_columns():
+    rows = [{"id": 1, "geo": {"lat": 1.5, "lon": -2}}, {"geo": {"lon": 3, "lat": 0.5}, "id": 2}]
+    assert encode({"places": rows}, EncodeOptions(fold_depth=1)) == "places[2]{id,geo.lat,geo.lon}:\n  1,1.5,-2\n  2,0.5,3"
+    assert encode({"places": rows}) == encode({"places": rows}, EncodeOptions(fold_depth=0))
+
+    deep = [{"a": {"b": {"c": i}}} for i in range(2)]
+    assert encode(deep, EncodeOptions(fold_depth=2)) == "[2]{a.b.c}:\n0\n1"
+    assert encode(deep, EncodeOptions(fold_depth=1)) == encode(deep)
+
+
+def test_fold_depth_requires_uniform_nested_shapes():
+    options = EncodeOptions(fold_depth=3)
+    for rows in (
+        [{"geo": {"lat": 1}}, {"geo": {"lon": 1}}],
+        [{"geo": {"lat": 1}}, {"geo": 1}],
+        [{"geo": {"lat": [1]}}],
+        [{"geo": {"first name": 1}}],
+        [{"geo": {"a.b": 1}}],
+        [{"geo": {}}],
+    ):
+        assert encode(rows, options) == encode(rows)
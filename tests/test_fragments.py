@@ -0,0 +1,86 @@
+from toon_py import Encoder, EncodeOptions, FragmentCache, Versioned, encode
+
+CATALOG = {"products": [{"sku": "A1", "qty": 2}, {"sku": "B2", "qty": 1}], "meta": {"source": "erp"}}
+
+
+def test_fragment_cache_reuses_unchanged_fields():
+    encoder = Encoder(EncodeOptions(fragment_cache_lines=100))
+    for turn in range(3):
+        document = {"catalog": CATALOG, "turn": turn, "notes": [f"turn {turn}"]}
+        assert encoder.encode(document) == encode(document)
+
+    info = encoder.fragments.cache_info()
+    assert info["hits"] == 2
+    assert info["misses"] == 4
+
+
+def test_fragment_cache_detects_changed_content():
+    encoder = Encoder(EncodeOptions(fragment_cache_lines=100))
+    catalog = {"products": [{"sku": "A1", "qty": 2}]}
+    encoder.encode({"catalog": catalog})
+    catalog["products"].append({"sku": "B2", "qty": 1})
+    assert encoder.encode({"catalog": catalog}) == encode({"catalog": catalog})
+
+
+def test_versioned_fields():
+    encoder = Encoder(EncodeOptions(fragment_cache_lines=100))
+    catalog = {"products": [{"sku": "A1", "qty": 2}]}
+    assert encoder.encode({"catalog": Versioned(catalog, 1), "turn": 1}) == encode({"catalog": catalog, "turn": 1})
+
+    catalog["products"][0]["qty"] = 5
+    assert encoder.encode({"catalog": Versioned(catalog, 1)}) == "catalog:\n  products[1]{sku,qty}:\n    A1,2"
+    assert encoder.encode({"catalog": Versioned(catalog, 2)}) == "catalog:\n  products[1]{sku,qty}:\n    A1,5"
+
+
+def test_versioned_without_cache():
+    data = {"items": [{"id": 1, "tags": Versioned(["a", "b"], "v1")}], "count": Versioned(1, "v1")}
+    assert encode(data) == "items[1]:\n  - id: 1\n    tags[2]: a,b\ncount: 1"
+
+
+def test_fragment_cache_evicts_least_recently_used():
+    cache = FragmentCache(max_lines=3)
+    cache.put("a", ["1", "2"])
+    cache.put("b", ["3"])
+    assert cache.get("a") == ["1", "2"]
+    cache.put("c", ["4"])
+    assert cache.get("b") is None
+    assert cache.get("a") == ["1", "2"]
+    assert cache.cache_info()["lines"] == 3
+    assert cache.put("d", ["5", "6", "7", "8"]) == ["5", "6", "7", "8"]
+    assert cache.get("d") is None
+
+
+def test_versioned_siblings_keep_their_own_lines():
+    encoder = Encoder(EncodeOptions(fragment_cache_lines=1000))
+    products = {"products": [{"id": 1, "details": Versioned({"color": "red"}, 1)}, {"id": 2, "details": Versioned({"color": "blue"}, 1)}]}
+    expected = "products[2]:\n  - id: 1\n    details:\n      color: red\n  - id: 2\n    details:\n      color: blue"
+    assert encoder.encode(products) == expected
+    assert encoder.encode(products) == expected
+
+    nested = {"a": {"cfg": Versioned({"x": 1}, "v1")}, "b": {"cfg": Versioned({"x": 2}, "v1")}}
+    assert encoder.encode(nested) == "a:\n  cfg:\n    x: 1\nb:\n  cfg:\n    x: 2"
+
+
+def test_versioned_array_items_are_unwrapped():
+    data = {"xs": [Versioned({"a": 1}, 1), 2]}
+    assert encode(data) == "xs[2]:\n  - a: 1\n  - 2"
+    assert Encoder(EncodeOptions(fragment_cache_lines=100)).encode(data) == "xs[2]:\n  - a: 1\n  - 2"
+    assert encode([Versioned([1, 2], 1), Versioned("x", 1)]) == "[2]:\n  - [2]: 1,2\n  - x"
+
+
+def test_versioned_does_not_change_output():
+    rows = [{"a": 1}, {"a": 2}]
+    positions = [
+        lambda x: {"items": [{"rows": x, "b": 2}, 1]},
+        lambda x: {"a": [x, 2]},
+        lambda x: [{"x": x}, {"x": 2}],
+    ]
+    for value, wrap in zip([rows, 1, 1], positions):
+        expected = encode(wrap(value))
+        assert encode(wrap(Versioned(value, 1))) == expected
+        encoder = Encoder(EncodeOptions(fragment_cache_lines=100))
+        assert encoder.encode(wrap(Versioned(value, 1))) == expected
+        assert encoder.encode(wrap(Versioned(value, 1))) == expected
+
+    assert encode([Versioned({"a": 1}, 1), {"a": 2}]) == encode([{"a": 1}, {"a": 2}])
+
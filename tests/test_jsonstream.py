@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from toon_py import Encoder, EncodeOptions, encode
+from toon_py.jsonstream import JsonReader, iter_json_lines, scan_array
+
+
+def stream_encode(value, chunk_size=8, options=None) -> str:
+    reader = JsonReader(json.dumps(value).encode(), chunk_size=chunk_size)
+    return "\n".join(iter_json_lines(reader, Encoder(options or EncodeOptions())))
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        [{"id": i, "name": f"user {i}", "score": i / 3} for i in range(50)],
+        {"users": [{"id": 1, "ok": True}, {"id": 2, "ok": False}], "meta": {"count": 2}, "tags": ["a", "b"]},
+        {"rows": [{"a": 1}, {"b": 2}], "nested": [[1, 2], {"x": [3]}], "empty": []},
+        [1, "two", None, 3.25, "ünïcode ✓"],
+        {},
+        [],
+        "just a string",
+        12345.678,
+    ],
+)
+def test_stream_matches_encode(value):
+    assert stream_encode(value) == encode(value)
+    assert stream_encode(value, options=EncodeOptions(delimiter="\t", indent=4)) == encode(value, EncodeOptions(delimiter="\t", indent=4))
+
+
+def test_scan_array_replays_from_offset():
+    reader = JsonReader(b'  [{"a": 1}, {"a": 22}] ', chunk_size=4)
+    items, shape, keys = scan_array(reader)
+    assert (len(items), shape, keys) == (2, "tabular", ("a",))
+    assert list(items) == [{"a": 1}, {"a": 22}]
+    assert list(items) == [{"a": 1}, {"a": 22}]
+    reader.expect_end()
+
+
+def test_stream_invalid_json():
+    reader = JsonReader(b'{"a": [1, 2,]}')
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_lines(reader, Encoder(EncodeOptions())))
@@ -0,0 +1,36 @@
+from toon_py import Encoder, EncodeOptions, encode, profile
+
+DATA = {
+    "users": [{"id": i, "name": "a, b" if i % 2 else "plain", "score": i / 4} for i in range(6)],
+    "tags": ["x", "y"],
+    "items": [1, {"a": []}],
+}
+
+
+def test_profile_context_manager():
+    with profile() as stats:
+        text = encode(DATA)
+
+    assert text == encode(DATA)
+    data = stats.as_dict()
+    assert data["encodes"] == 1
+    assert data["lines"] == len(text.split("\n"))
+    assert data["chars"] == len(text)
+    assert data["cells"] == 6 * 3 + 2 + 1
+    assert (data["strings_quoted"], data["strings_plain"]) == (3, 5)
+    assert (data["keys_quoted"], data["keys_plain"]) == (0, 7)
+    assert (data["arrays_tabular"], data["arrays_primitive"], data["arrays_list"], data["arrays_empty"]) == (1, 1, 1, 1)
+    assert data["total_ns"] >= data["classify_ns"] + data["quote_ns"] + data["format_ns"]
+    assert data["assembly_ns"] == data["total_ns"] - data["classify_ns"] - data["quote_ns"] - data["format_ns"]
+
+
+def test_profile_option_and_disabled_by_default():
+    encoder = Encoder(EncodeOptions(profile=True, quote_cache_size=16))
+    encoder.encode_many([DATA, DATA])
+    assert encoder.profile.encodes == 2
+    assert encoder.profile.strings_quoted == 6
+
+    assert Encoder().profile is None
+    with profile():
+        pass
+    assert Encoder().profile is None
@@ -1,5 +1,6 @@
 import pytest
-from toon_py import encode
+from toon_py import Encoder, encode, EncodeOptions
+from toon_py.quoting import QuoteCache
 
 
 def test_quote_string_with_comma():
@@ -114,3 +115,51 @@ def test_escape_backslash():
     data = {"path": "C:\\Users"}
     result = encode(data)
     assert result == 'path: "C:\\\\Users"'
+
+
+def test_escape_control_character():
+    data = {"text": "a\x01b"}
+    result = encode(data)
+    assert result == 'text: "a\\u0001b"'
+
+
+def test_quote_delimiter_specific():
+    data = {"values": ["a,b", "c|d"]}
+    assert encode(data, EncodeOptions(delimiter="|")) == 'values[2|]: a,b|"c|d"'
+    assert encode(data) == 'values[2]: "a,b",c|d'
+
+
+def test_quote_unicode_digit_strings():
+    data = {"values": ["١٢", "0²", "x²"]}
+    result = encode(data)
+    assert result == 'values[3]: "١٢","0²",x²'
+
+
+def test_unquoted_structural_lookalikes():
+    data = {"values": ["-", "truthy", "nullable", "[x]", "{", "1.2.3", "e5"]}
+    result = encode(data)
+    assert result == "values[7]: -,truthy,nullable,[x],{,1.2.3,e5"
+
+
+def test_quote_cache_reuses_decisions():
+    data = {"rows": [{"status": "active" if i % 2 else "a,b", "code": "007"} for i in range(100)]}
+    encoder = Encoder(EncodeOptions(quote_cache_size=16))
+    assert encoder.encode(data) == encode(data)
+
+    info = encoder.quote_cache.cache_info()
+    assert info["misses"] == 6
+    assert info["hits"] == 197
+    assert info["keys"] == 3
+    assert info["values"] == 3
+
+
+def test_quote_cache_is_bounded():
+    cache = QuoteCache("|", maxsize=2)
+    for value in ["a", "b", "c|d", "a"]:
+        cache.quote_value(value)
+    assert cache.quote_value("c|d") == '"c|d"'
+    info = cache.cache_info()
+    assert info["values"] == 2
+    assert info["hits"] == 1
+    cache.clear()
+    assert cache.cache_info()["values"] == 0
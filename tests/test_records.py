@@ -0,0 +1,99 @@
+from dataclasses import asdict, dataclass, field
+from fractions import Fraction
+from pathlib import Path
+from typing import NamedTuple
+
+from toon_py import encode, EncodeOptions
+from toon_py.records import get_plan
+
+
+@dataclass
+class Item:
+    sku: str
+    qty: int
+    price: float
+
+
+@dataclass
+class Order:
+    id: int
+    items: list
+    customer: "Customer"
+    notes: list = field(default_factory=list)
+
+
+class Point(NamedTuple):
+    x: int
+    y: int
+
+
+class Customer:
+    __slots__ = ("name", "email")
+
+    def __init__(self, name, email):
+        self.name = name
+        self.email = email
+
+
+class VipCustomer(Customer):
+    __slots__ = "tier"
+
+    def __init__(self, name, email, tier):
+        super().__init__(name, email)
+        self.tier = tier
+
+
+def test_dataclass_list_is_tabular():
+    items = [Item("A1", 2, 9.99), Item("B 2", 1, 14.5)]
+    assert encode({"items": items}) == "items[2]{sku,qty,price}:\n  A1,2,9.99\n  B 2,1,14.5"
+    assert encode(items, EncodeOptions(delimiter="|")) == encode([asdict(item) for item in items], EncodeOptions(delimiter="|"))
+
+
+def test_namedtuple_and_slots_records():
+    assert encode([Point(1, 2), Point(3, 4)]) == "[2]{x,y}:\n1,2\n3,4"
+    assert encode(Point(1, -2)) == "x: 1\ny: -2"
+    assert encode({"who": VipCustomer("Ada", "ada@example.com", "gold")}) == "who:\n  name: Ada\n  email: ada@example.com\n  tier: gold"
+    assert get_plan(VipCustomer).fields == ("name", "email", "tier")
+
+
+def test_slots_records_skip_stdlib_types_and_unset_slots():
+    assert encode({"p": Path("/tmp/x"), "f": Fraction(1, 3)}) == "p: null\nf: null"
+    assert get_plan(Path) is None
+
+    customer = Customer.__new__(Customer)
+    customer.name = "Ada"
+    assert encode({"who": customer}) == "who:\n  name: Ada\n  email: null"
+    assert encode([customer, Customer("Bo", "b@c.d")]) == "[2]{name,email}:\nAda,null\nBo,b@c.d"
+
+
+def test_nested_records_match_dicts():
+    order = Order(7, [Item("A1", 2, 9.99)], Customer("Ada", "a@b.c"), [Point(0, 0), {"x": 1, "y": 2}, "done"])
+    as_dict = {
+        "id": 7,
+        "items": [{"sku": "A1", "qty": 2, "price": 9.99}],
+        "customer": {"name": "Ada", "email": "a@b.c"},
+        "notes": [{"x": 0, "y": 0}, {"x": 1, "y": 2}, "done"],
+    }
+    assert encode(order) == encode(as_dict)
+    assert encode([order, order]) == encode([as_dict, as_dict])
+    assert encode({"rows": [{"a": 1, "p": Point(1, 2)}]}) == encode({"rows": [{"a": 1, "p": {"x": 1, "y": 2}}]})
+
+
+def test_record_types_with_same_fields_share_a_table():
+    @dataclass
+    class Other:
+        sku: str
+        qty: int
+        price: float
+
+    assert encode([Item("A1", 1, 1.5), Other("B2", 2, 2.5)]) == "[2]{sku,qty,price}:\nA1,1,1.5\nB2,2,2.5"
+    assert encode([Item("A1", 1, 1.5), Point(1, 2)]) == "[2]:\n  - sku: A1\n    qty: 1\n    price: 1.5\n  - x: 1\n    y: 2"
+
+
+def test_plain_objects_are_not_records():
+    class Plain:
+        pass
+
+    assert get_plan(Plain) is None
+    assert get_plan(int) is None
+    assert encode({"x": Plain()}) == "x: null"
@@ -0,0 +1,76 @@
+import subprocess
+import sys
+from collections import deque
+from dataclasses import dataclass
+
+import pytest
+
+from toon_py import encode, EncodeOptions
+from toon_py.encoder import spool_array
+from toon_py.spool import SpooledArray
+
+
+@dataclass
+class Row:
+    id: int
+    name: str
+
+
+def test_tuples_sets_and_ranges_encode_as_arrays():
+    assert encode({"pair": (1, 2), "tags": frozenset({"a"}), "ids": range(3), "queue": deque(["x"])}) == (
+        "pair[2]: 1,2\ntags[1]: a\nids[3]: 0,1,2\nqueue[1]: x"
+    )
+    assert encode((1, "a")) == "[2]: 1,a"
+    assert encode({"rows": ({"a": 1, "b": (2, 3)},)}) == "rows[1]:\n  - a: 1\n    b[2]: 2,3"
+
+
+def test_generators_encode_as_arrays():
+    rows = ({"id": i, "name": f"user {i}"} for i in range(3))
+    assert encode({"rows": rows}) == "rows[3]{id,name}:\n  0,user 0\n  1,user 1\n  2,user 2"
+    assert encode({"empty": iter([])}) == "empty[0]:"
+    assert encode([iter([1, 2]), (x for x in [])]) == "[2]:\n  - [2]: 1,2\n  - [0]:"
+    assert encode({"rows": (Row(i, "x") for i in range(2))}) == "rows[2]{id,name}:\n  0,x\n  1,x"
+
+
+def test_generators_spool_to_disk():
+    rows = [{"id": i, "name": f"user {i}"} for i in range(50)]
+    options = EncodeOptions(spool_rows=8)
+    assert encode({"rows": iter(rows)}, options) == encode({"rows": rows})
+    assert encode({"items": (x for x in [1, {"a": 1}, [2]])}, options) == encode({"items": [1, {"a": 1}, [2]]})
+
+
+def test_spooled_files_are_closed():
+    code = (
+        "from toon_py import encode, encode_with_budget, EncodeOptions\n"
+        "options = EncodeOptions(spool_rows=8)\n"
+        "encode({'rows': ({'a': i} for i in range(50))}, options)\n"
+        "encode({'items': (x for x in [1, {'a': 1}] * 20)}, options)\n"
+        "encode_with_budget({'rows': ({'a': i} for i in range(50))}, options, max_chars=20)\n"
+        "encode_with_budget({'a': 'x' * 30, 'rows': ({'a': i} for i in range(50))}, options, max_chars=20)\n"
+    )
+    result = subprocess.run([sys.executable, "-X", "dev", "-W", "error::ResourceWarning", "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0
+    assert result.stderr == ""
+
+
+def test_spool_array_merges_batch_shapes():
+    rows = [{"a": i, "b": i} for i in range(5)] + [{"b": 5, "a": 5}]
+    spool, shape, keys = spool_array(iter(rows), 2, batch_size=2)
+    assert (shape, keys, len(spool)) == ("tabular", ("a", "b"), 6)
+    assert list(spool) == rows
+    assert spool_array(iter(rows + [{"a": 1}]), 2, batch_size=2)[1:] == ("mixed", None)
+    assert spool_array(iter([1, 2, {"a": 1}]), 2, batch_size=2)[1:] == ("mixed", None)
+    assert spool_array(iter([Row(1, "x"), {"id": 2, "name": "y"}]), 2, batch_size=1)[1:] == ("mixed", None)
+
+
+def test_spooled_array_keeps_unpicklable_rows_in_memory():
+    spool = SpooledArray(max_rows=1)
+    spool.extend([1])
+    spool.extend([2])
+    spool.extend([lambda: None])
+    spool.extend([3])
+    items = list(spool)
+    assert items[:2] == [1, 2] and callable(items[2]) and items[3] == 3
+    assert spool.file is None
+    with pytest.raises(ValueError):
+        list(spool)
@@ -0,0 +1,52 @@
+import base64
+import json
+
+import pytest
+
+from toon_py import BpeEstimator, encode, estimate_tokens, stats, EncodeOptions
+from toon_py.tokens import count_tokens, iter_json
+
+DATA = {"users": [{"id": i, "name": f"user {i}", "active": i % 2 == 0} for i in range(30)]}
+
+
+def test_estimate_tokens_heuristic():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("hello world") == 2
+    assert estimate_tokens("internationalization") == 4
+    assert estimate_tokens("12345678") == 3
+    assert estimate_tokens('{"a":1}') == 5
+
+
+def test_stats_matches_full_outputs():
+    report = stats(DATA, EncodeOptions(delimiter="|"))
+    toon = encode(DATA, EncodeOptions(delimiter="|"))
+    compact = json.dumps(DATA, separators=(",", ":"))
+    assert (report.chars, report.json_chars) == (len(toon), len(compact))
+    assert (report.tokens, report.json_tokens) == (estimate_tokens(toon), estimate_tokens(compact))
+    assert 0.3 < report.token_savings < 0.7
+
+
+def test_stats_measures_iterables_as_arrays():
+    assert stats({"s": {0, 1}, "t": (1, 2), "r": range(3)}) == stats({"s": [0, 1], "t": [1, 2], "r": [0, 1, 2]})
+    assert stats({"g": (i for i in range(3))}) == stats({"g": [0, 1, 2]})
+    rows = [{"id": i, "tags": ["a", "b"]} for i in range(40)]
+    generated = ({"id": row["id"], "tags": iter(row["tags"])} for row in rows)
+    assert stats({"rows": generated}, EncodeOptions(spool_rows=8)) == stats({"rows": rows})
+
+
+def test_iter_json_chunks():
+    value = {"rows": list(range(1000)), "text": "ünïcode"}
+    chunks = list(iter_json(value, chunk_size=100))
+    assert len(chunks) > 1
+    assert "".join(chunks) == json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+    assert count_tokens(chunks, len) == (sum(map(len, chunks)), sum(map(len, chunks)))
+
+
+def test_bpe_estimator(tmp_path):
+    vocab = tmp_path / "vocab.tiktoken"
+    tokens = [b"hello", b" world", b"wor", b"ld", b"h", b"e"]
+    vocab.write_text("".join(f"{base64.b64encode(token).decode()} {rank}\n" for rank, token in enumerate(tokens)))
+    estimator = BpeEstimator(str(vocab))
+    assert estimator("hello world") == 2
+    assert estimator("hello worlds") == 3
+    assert stats({"greeting": "hello"}, estimator=estimator).tokens == estimator("greeting: hello")